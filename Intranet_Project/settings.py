@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -48,6 +50,8 @@ AUTHENTICATION_BACKENDS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    # serves STATIC_ROOT before sessions/auth run; see TIMESHEET_STATIC_PROFILE below
+    'Timesheet.staticfiles.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -88,6 +92,28 @@ DATABASES = {
     }
 }
 
+# SQLite profile (TIMESHEET_SQLITE_PROFILE): 'hardened' (default) lets concurrent
+# timesheet posts queue for the write lock instead of failing with "database is locked":
+# WAL so readers never block the writer, a busy timeout, and BEGIN IMMEDIATE so a write
+# transaction takes the lock up front rather than failing when it upgrades mid-way.
+# The pragmas are applied per connection by Timesheet.signals.configure_sqlite.
+# 'default' keeps SQLite's stock behaviour.
+TIMESHEET_SQLITE_PROFILE = os.environ.get('TIMESHEET_SQLITE_PROFILE', 'hardened')
+if TIMESHEET_SQLITE_PROFILE not in ('hardened', 'default'):
+    raise ImproperlyConfigured(f'Unknown TIMESHEET_SQLITE_PROFILE {TIMESHEET_SQLITE_PROFILE!r}')
+if TIMESHEET_SQLITE_PROFILE == 'hardened' and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['OPTIONS'] = {
+        # seconds to wait for the write lock (sqlite3 busy timeout)
+        'timeout': 20,
+        'transaction_mode': 'IMMEDIATE',
+    }
+    TIMESHEET_SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 20000,
+        'mmap_size': 128 * 1024 * 1024,
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -131,6 +157,22 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Static profile (TIMESHEET_STATIC_PROFILE):
+#   plain (default)  files keep their names; no collectstatic needed to render pages
+#   compressed       collectstatic writes content-hashed names plus .gz (and .br with
+#                    the optional brotli package) copies; pages fail to render until
+#                    collectstatic has run, so enable it only where deploys run it
+# Either way StaticFilesMiddleware serves whatever is in STATIC_ROOT, with hashed
+# files cached by browsers for a year.
+TIMESHEET_STATIC_PROFILE = os.environ.get('TIMESHEET_STATIC_PROFILE', 'plain')
+if TIMESHEET_STATIC_PROFILE == 'compressed':
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'Timesheet.staticfiles.CompressedManifestStaticFilesStorage'},
+    }
+elif TIMESHEET_STATIC_PROFILE != 'plain':
+    raise ImproperlyConfigured(f'Unknown TIMESHEET_STATIC_PROFILE {TIMESHEET_STATIC_PROFILE!r}')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -158,7 +200,116 @@ AXES_COOLOFF_TIME = 1
 # because newer django-axes versions use different names / behaviors.
 AXES_LOCKOUT_TEMPLATE = 'Timesheet/lockout.html'
 
+# Cache and session profiles
+# Chosen with environment variables so one settings file serves development and the
+# intranet server:
+#   TIMESHEET_CACHE_PROFILE    file (default) | locmem | redis | none
+#   TIMESHEET_SESSION_PROFILE  cached_db (default) | db | signed_cookies
+# 'file' is shared by every gunicorn worker on the host; 'locmem' is per-process and
+# only suitable for a single worker or development. 'redis' needs the redis package
+# and TIMESHEET_CACHE_URL (default redis://127.0.0.1:6379/1).
+TIMESHEET_CACHE_PROFILE = os.environ.get('TIMESHEET_CACHE_PROFILE', 'file')
+TIMESHEET_SESSION_PROFILE = os.environ.get('TIMESHEET_SESSION_PROFILE', 'cached_db')
+
+if TIMESHEET_CACHE_PROFILE == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('TIMESHEET_CACHE_DIR', os.path.join(BASE_DIR, 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+elif TIMESHEET_CACHE_PROFILE == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'timesheet',
+        }
+    }
+elif TIMESHEET_CACHE_PROFILE == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('TIMESHEET_CACHE_URL', 'redis://127.0.0.1:6379/1'),
+        }
+    }
+elif TIMESHEET_CACHE_PROFILE == 'none':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    }
+else:
+    raise ImproperlyConfigured(f'Unknown TIMESHEET_CACHE_PROFILE {TIMESHEET_CACHE_PROFILE!r}')
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+try:
+    SESSION_ENGINE = SESSION_ENGINES[TIMESHEET_SESSION_PROFILE]
+except KeyError:
+    raise ImproperlyConfigured(f'Unknown TIMESHEET_SESSION_PROFILE {TIMESHEET_SESSION_PROFILE!r}')
+
+# Keep axes lockout counters in the cache when it supports atomic increments shared
+# between workers, so login checks don't hit the database. django-axes rejects the
+# file, locmem and dummy backends for this, so those profiles keep the database handler.
+if TIMESHEET_CACHE_PROFILE == 'redis':
+    AXES_HANDLER = 'axes.handlers.cache.AxesCacheHandler'
+else:
+    AXES_HANDLER = 'axes.handlers.database.AxesDatabaseHandler'
+
 # Authentication redirects
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 
+# Timesheet entry: maximum number of rows accepted for a single timesheet
+# (applies to both the JSON grid payload and the legacy form-encoded rows)
+TIMESHEET_MAX_ROWS = 100
+
+# Double-booking check: an employee's hours for one day, summed across every
+# timesheet for the week, above this limit are reported as a conflict
+TIMESHEET_DAILY_HOURS_LIMIT = 12
+
+# Weekly hours above this count as overtime in the employee hours ledger
+TIMESHEET_WEEKLY_OVERTIME_HOURS = 40
+
+# Bulk upload: most new users one web upload may create. Each password hash
+# takes about half a second, so larger files go through
+# `python manage.py provision_users FILE` rather than a request.
+TIMESHEET_BULK_UPLOAD_MAX_USERS = 25
+
+# Email (TIMESHEET_EMAIL_PROFILE) for the weekly digest:
+#   console (default)  print messages to stdout
+#   file               write one file per run to TIMESHEET_EMAIL_DIR (default sent_mail/)
+#   smtp               send through EMAIL_HOST/EMAIL_PORT with EMAIL_HOST_USER/EMAIL_HOST_PASSWORD
+TIMESHEET_EMAIL_PROFILE = os.environ.get('TIMESHEET_EMAIL_PROFILE', 'console')
+if TIMESHEET_EMAIL_PROFILE == 'console':
+    EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+elif TIMESHEET_EMAIL_PROFILE == 'file':
+    EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+    EMAIL_FILE_PATH = os.environ.get('TIMESHEET_EMAIL_DIR', os.path.join(BASE_DIR, 'sent_mail'))
+elif TIMESHEET_EMAIL_PROFILE == 'smtp':
+    EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+    EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+    EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+    EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+    EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', '1') == '1'
+    EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', 30))
+else:
+    raise ImproperlyConfigured(f'Unknown TIMESHEET_EMAIL_PROFILE {TIMESHEET_EMAIL_PROFILE!r}')
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'timesheets@localhost')
+
+# Send the Timesheet app's INFO messages (e.g. digest throughput) to the console
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'Timesheet': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
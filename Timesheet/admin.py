@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Employee, Timesheet
+from .models import Employee, Timesheet, ArchivedTimesheet
 
 
 @admin.register(Employee)
@@ -29,3 +29,13 @@ class TimesheetRowInline(admin.TabularInline):
 
 TimesheetAdmin.inlines = [TimesheetRowInline]
 
+
+@admin.register(ArchivedTimesheet)
+class ArchivedTimesheetAdmin(admin.ModelAdmin):
+	list_display = ('original_id', 'owner', 'week_start', 'archived_at')
+	list_filter = ('week_start',)
+	exclude = ('rows_data',)
+	readonly_fields = ('original_id', 'owner', 'created_at', 'week_start', 'additional_notes', 'archived_at')
+
+	def has_add_permission(self, request):
+		return False
@@ -0,0 +1,155 @@
+"""Payroll exception checks over a period of timesheet rows.
+
+A period is loaded with a single ``.values_list`` query into a pandas frame
+(one column per weekday) and every rule runs as a vectorized operation over
+the whole frame, so a year of rows is checked in well under a second:
+
+- ``daily``: an employee's hours for one day, summed across all timesheets,
+  exceed the daily limit (settings.TIMESHEET_DAILY_HOURS_LIMIT)
+- ``weekly``: an employee's hours for the week exceed the weekly limit
+  (settings.TIMESHEET_WEEKLY_OVERTIME_HOURS)
+- ``weekend``: an employee has hours on Saturday or Sunday
+- ``non_numeric``: a cell looks like an attempt at hours ('8h', '8..5') but
+  isn't a number; codes without digits such as 'Vaca' or 'Sick' are allowed
+
+Archived timesheets are closed and are not checked.
+"""
+import numpy as np
+import pandas as pd
+from django.conf import settings
+
+from .conflicts import DAY_LABELS
+from .models import TimesheetRow, DAY_FIELDS
+
+
+RULES = {
+    'daily': 'Shift over daily limit',
+    'weekly': 'Week over overtime limit',
+    'weekend': 'Weekend work',
+    'non_numeric': 'Entry is not a number',
+}
+WEEKEND_FIELDS = ['sat', 'sun']
+# rows are grouped per employee and week; rows not linked to a crew member
+# (employee_id 0) are grouped by the name typed on the timesheet
+KEY = ['week_start', 'employee_id', 'employee']
+
+
+def load_rows(date_from, date_to):
+    """Return a frame of every row on timesheets with week_start in [date_from, date_to].
+
+    Columns: timesheet_id, week_start, owner, employee_id (0 for rows not linked
+    to a crew member), employee (display name) and the raw DAY_FIELDS text.
+    """
+    columns = ['timesheet_id', 'week_start', 'owner', 'employee_id', 'linked_name', 'employee_name', *DAY_FIELDS]
+    values = TimesheetRow.objects.filter(
+        timesheet__week_start__gte=date_from, timesheet__week_start__lte=date_to
+    ).values_list(
+        'timesheet_id', 'timesheet__week_start', 'timesheet__owner__username',
+        'employee_id', 'employee__name', 'employee_name', *DAY_FIELDS,
+    )
+    frame = pd.DataFrame.from_records(list(values), columns=columns)
+    frame['employee_id'] = frame['employee_id'].fillna(0).astype('int64')
+    frame['employee'] = frame.pop('linked_name').fillna(frame.pop('employee_name')).replace('', '(no name)')
+    return frame
+
+
+def parse_frame(frame):
+    """Return (hours, non_numeric) frames aligned with frame's DAY_FIELDS.
+
+    hours holds each cell as a float, NaN when blank or not a number (same
+    rules as utils.parse_hours); non_numeric marks cells containing a digit
+    that still didn't parse.
+    """
+    text = frame[DAY_FIELDS]
+    hours = text.apply(pd.to_numeric, errors='coerce')
+    hours = hours.where(np.isfinite(hours))
+    # only the few filled cells that didn't parse need the (per-cell) digit check
+    suspect = hours.isna() & text.ne('')
+    non_numeric = pd.DataFrame(False, index=text.index, columns=DAY_FIELDS)
+    for day in DAY_FIELDS:
+        rows = suspect[day]
+        non_numeric.loc[rows, day] = text.loc[rows, day].str.contains(r'\d', regex=True)
+    return hours, non_numeric
+
+
+def _timesheets(frame, flagged):
+    # (timesheet id, owner) pairs behind each flagged employee week
+    keys = pd.MultiIndex.from_frame(flagged[KEY].drop_duplicates())
+    pairs = frame.loc[pd.MultiIndex.from_frame(frame[KEY]).isin(keys), KEY + ['timesheet_id', 'owner']].drop_duplicates()
+    sheets = {}
+    for *key, ts_id, owner in pairs.itertuples(index=False):
+        sheets.setdefault(tuple(key), []).append((ts_id, owner))
+    return sheets
+
+
+COLUMNS = ['rule', 'label', 'week_start', 'employee_id', 'employee', 'day', 'hours', 'value', 'timesheets']
+
+
+def find_exceptions(date_from, date_to, daily_limit=None, weekly_limit=None, rules=None):
+    """Run the payroll rules over the period and return the exceptions as a frame.
+
+    rules limits the check to a subset of RULES. The frame has one exception per
+    row with COLUMNS: 'rule', 'label', 'week_start', 'employee_id' (0 for
+    unlinked rows), 'employee', 'day' (label, or '' for weekly), 'hours' (NaN
+    for non_numeric), 'value' (raw text for non_numeric) and 'timesheets' (list
+    of (timesheet id, owner)), sorted by week and employee. Use as_records() to
+    turn (a slice of) it into dicts for templates.
+    """
+    if daily_limit is None:
+        daily_limit = getattr(settings, 'TIMESHEET_DAILY_HOURS_LIMIT', 12)
+    if weekly_limit is None:
+        weekly_limit = getattr(settings, 'TIMESHEET_WEEKLY_OVERTIME_HOURS', 40)
+    rules = set(rules or RULES)
+
+    frame = load_rows(date_from, date_to)
+    if frame.empty:
+        return pd.DataFrame(columns=COLUMNS)
+    hours, non_numeric = parse_frame(frame)
+
+    # employee/week x day totals across every timesheet
+    totals = hours.fillna(0).groupby([frame[k] for k in KEY]).sum()
+    totals.columns.name = 'day'
+    found = []
+
+    def by_day(rule, mask):
+        flagged = totals.where(mask).stack().rename('hours').reset_index()
+        found.append(flagged.assign(rule=rule, value=''))
+
+    if 'daily' in rules:
+        by_day('daily', totals > daily_limit)
+    if 'weekend' in rules:
+        by_day('weekend', (totals > 0) & totals.columns.isin(WEEKEND_FIELDS))
+    if 'weekly' in rules:
+        week_totals = totals.sum(axis=1)
+        flagged = week_totals[week_totals > weekly_limit].rename('hours').reset_index()
+        found.append(flagged.assign(rule='weekly', day='', value=''))
+    if 'non_numeric' in rules:
+        cells = non_numeric.stack()
+        cells = cells[cells].index
+        flagged = frame.loc[cells.get_level_values(0), KEY].reset_index(drop=True)
+        found.append(flagged.assign(
+            rule='non_numeric', day=cells.get_level_values(1), hours=np.nan,
+            value=frame[DAY_FIELDS].stack()[cells].to_numpy(),
+        ))
+
+    found = [f for f in found if not f.empty]
+    if not found:
+        return pd.DataFrame(columns=COLUMNS)
+    found = pd.concat(found, ignore_index=True)
+    sheets = _timesheets(frame, found)
+    found['timesheets'] = [sheets[key] for key in found[KEY].itertuples(index=False, name=None)]
+    found['label'] = found['rule'].map(RULES)
+    found['rule_order'] = found['rule'].map({rule: n for n, rule in enumerate(RULES)})
+    found['day_order'] = found['day'].map({day: n for n, day in enumerate(DAY_FIELDS)}).fillna(-1)
+    found['day'] = found['day'].map(dict(zip(DAY_FIELDS, DAY_LABELS))).fillna('')
+    found['employee_order'] = found['employee'].str.lower()
+    found = found.sort_values(['week_start', 'employee_order', 'employee_id', 'rule_order', 'day_order'])
+    return found[COLUMNS].reset_index(drop=True)
+
+
+def as_records(frame):
+    """Convert an exceptions frame to dicts, with None for missing employee_id and hours."""
+    return [
+        {**record, 'employee_id': record['employee_id'] or None, 'hours': None if pd.isna(record['hours']) else record['hours']}
+        for record in frame.to_dict('records')
+    ]
@@ -0,0 +1,333 @@
+"""Versioned JSON API (v1) over timesheets, timesheet rows, archived timesheets and employees.
+
+List endpoints stream their response straight from ``.values().iterator()`` so
+large pulls never build model instances or hold a whole page in memory. They
+support:
+
+- cursor pagination: ``?limit=N`` (max MAX_PAGE_SIZE) and the opaque ``next``
+  cursor returned with each page, passed back as ``?cursor=...``
+- sparse fieldsets: ``?fields=id,week_start,owner``
+- filters: ``week``, ``week_from``, ``week_to``, ``owner`` (username) and
+  ``jobsite`` (jobsite number); rows also accept ``employee`` and ``timesheet``
+
+Bulk create/update endpoints take a JSON array and apply it all-or-nothing with
+the same permission rules as the HTML views. Authentication is the regular
+session login, so writes need the CSRF token like any other form post.
+"""
+import base64
+import json
+import zlib
+from datetime import datetime
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef
+from django.http import JsonResponse, StreamingHttpResponse
+from django.contrib.auth.models import User
+from django.views.decorators.http import require_GET, require_http_methods
+
+from .forms import TimesheetForm, TimesheetRowsForm
+from .models import ArchivedTimesheet, Employee, Timesheet, TimesheetRow, DAY_FIELDS
+from .roles import is_admin_or_accounting
+from .editing import save_rows, timesheet_is_editable
+from . import ledger
+
+
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+MAX_BULK_ITEMS = 200
+
+# public field name -> ORM lookup passed to .values()
+TIMESHEET_FIELDS = {
+    'id': 'id',
+    'owner': 'owner__username',
+    'week_start': 'week_start',
+    'created_at': 'created_at',
+    'additional_notes': 'additional_notes',
+}
+ROW_FIELDS = {
+    'id': 'id',
+    'timesheet': 'timesheet_id',
+    'week_start': 'timesheet__week_start',
+    'owner': 'timesheet__owner__username',
+    'employee': 'employee_id',
+    'employee_name': 'employee_name',
+    **{day: day for day in DAY_FIELDS},
+    'jobsite_name': 'jobsite_name',
+    'jobsite_num': 'jobsite_num',
+}
+ARCHIVED_TIMESHEET_FIELDS = {
+    'id': 'original_id',
+    'owner': 'owner__username',
+    'week_start': 'week_start',
+    'created_at': 'created_at',
+    'additional_notes': 'additional_notes',
+    'archived_at': 'archived_at',
+    'rows': 'rows_data',
+}
+EMPLOYEE_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'is_active': 'is_active',
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def api_view(view):
+    """Require a logged-in user and turn ApiError into a JSON error response."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Authentication required'}, status=401)
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as exc:
+            return JsonResponse({'error': exc.message}, status=exc.status)
+    return wrapper
+
+
+def _encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeError):
+        raise ApiError('Invalid cursor')
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        raise ApiError(f'{name} must be a date in YYYY-MM-DD format')
+
+
+def _selected_fields(request, available):
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(available)
+    names = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ApiError(f'Unknown fields: {", ".join(unknown)}')
+    return names
+
+
+def _filter_week(request, queryset, prefix=''):
+    if request.GET.get('week'):
+        queryset = queryset.filter(**{f'{prefix}week_start': _parse_date(request.GET['week'], 'week')})
+    if request.GET.get('week_from'):
+        queryset = queryset.filter(**{f'{prefix}week_start__gte': _parse_date(request.GET['week_from'], 'week_from')})
+    if request.GET.get('week_to'):
+        queryset = queryset.filter(**{f'{prefix}week_start__lte': _parse_date(request.GET['week_to'], 'week_to')})
+    if request.GET.get('owner'):
+        queryset = queryset.filter(**{f'{prefix}owner__username': request.GET['owner']})
+    return queryset
+
+
+def _unpack_archived_rows(value):
+    return json.loads(zlib.decompress(bytes(value)).decode('utf-8'))
+
+
+def _stream_page(request, queryset, available, converters=None):
+    """Stream one cursor page of queryset as {"results": [...], "next": cursor}.
+
+    converters optionally maps a public field name to a function applied to its value.
+    """
+    fields = _selected_fields(request, available)
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ApiError('limit must be an integer')
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if request.GET.get('cursor'):
+        queryset = queryset.filter(pk__gt=_decode_cursor(request.GET['cursor']))
+
+    # always fetch the pk so the next cursor can be built even when 'id' isn't selected
+    lookups = ['pk'] + [available[name] for name in fields]
+    values = queryset.order_by('pk').values_list(*lookups)[:limit + 1]
+    encoder = DjangoJSONEncoder()
+
+    def generate():
+        yield '{"results": ['
+        last_pk = None
+        has_more = False
+        for n, item in enumerate(values.iterator()):
+            if n == limit:
+                # the extra row only tells us there is another page
+                has_more = True
+                break
+            last_pk = item[0]
+            result = dict(zip(fields, item[1:]))
+            for name, convert in (converters or {}).items():
+                if name in result:
+                    result[name] = convert(result[name])
+            yield (',' if n else '') + encoder.encode(result)
+        yield '], "next": ' + encoder.encode(_encode_cursor(last_pk) if has_more else None) + '}'
+
+    return StreamingHttpResponse(generate(), content_type='application/json')
+
+
+def _visible_timesheets(user):
+    # same visibility as the dashboard: own timesheets, or all for Admin/Accounting
+    if is_admin_or_accounting(user):
+        return Timesheet.objects.all()
+    return Timesheet.objects.filter(owner=user)
+
+
+@require_GET
+@api_view
+def timesheet_list(request):
+    queryset = _filter_week(request, _visible_timesheets(request.user))
+    if request.GET.get('jobsite'):
+        queryset = queryset.filter(
+            Exists(TimesheetRow.objects.filter(timesheet=OuterRef('pk'), jobsite_num=request.GET['jobsite']))
+        )
+    return _stream_page(request, queryset, TIMESHEET_FIELDS)
+
+
+@require_GET
+@api_view
+def row_list(request):
+    queryset = TimesheetRow.objects.filter(timesheet__in=_visible_timesheets(request.user))
+    queryset = _filter_week(request, queryset, prefix='timesheet__')
+    if request.GET.get('jobsite'):
+        queryset = queryset.filter(jobsite_num=request.GET['jobsite'])
+    for param, lookup in (('employee', 'employee_id'), ('timesheet', 'timesheet_id')):
+        if request.GET.get(param):
+            try:
+                queryset = queryset.filter(**{lookup: int(request.GET[param])})
+            except ValueError:
+                raise ApiError(f'{param} must be an integer')
+    return _stream_page(request, queryset, ROW_FIELDS)
+
+
+@require_GET
+@api_view
+def archived_timesheet_list(request):
+    """Timesheets moved out of the hot tables by archive_timesheets, rows included."""
+    if is_admin_or_accounting(request.user):
+        queryset = ArchivedTimesheet.objects.all()
+    else:
+        queryset = ArchivedTimesheet.objects.filter(owner=request.user)
+    queryset = _filter_week(request, queryset)
+    return _stream_page(request, queryset, ARCHIVED_TIMESHEET_FIELDS, converters={'rows': _unpack_archived_rows})
+
+
+@require_GET
+@api_view
+def employee_list(request):
+    if is_admin_or_accounting(request.user):
+        queryset = Employee.objects.all()
+    else:
+        queryset = request.user.employees.all()
+    if request.GET.get('active') in ('0', '1'):
+        queryset = queryset.filter(is_active=request.GET['active'] == '1')
+    return _stream_page(request, queryset, EMPLOYEE_FIELDS)
+
+
+def _load_items(request):
+    try:
+        items = json.loads(request.body or b'[]')
+    except ValueError:
+        raise ApiError('Request body is not valid JSON')
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise ApiError('Request body must be an array of objects')
+    if len(items) > MAX_BULK_ITEMS:
+        raise ApiError(f'At most {MAX_BULK_ITEMS} items per request')
+    return items
+
+
+def _clean_rows(item, n):
+    if 'rows' not in item:
+        return None
+    rows_form = TimesheetRowsForm({'rows_json': json.dumps(item['rows'])})
+    if not rows_form.is_valid():
+        raise ApiError(f'Item {n}: {rows_form.errors["rows_json"][0]}')
+    return rows_form.cleaned_data['rows_json']
+
+
+def _bulk_create(request, items):
+    privileged = is_admin_or_accounting(request.user)
+    for n, item in enumerate(items):
+        for key in ('owner', 'week_start', 'additional_notes'):
+            if item.get(key) is not None and not isinstance(item[key], str):
+                raise ApiError(f'Item {n}: {key} must be a string')
+    usernames = {item['owner'] for item in items if item.get('owner')}
+    if usernames and not privileged:
+        raise ApiError('Only Admin/Accounting may create timesheets for other users', status=403)
+    owners = {u.username: u for u in User.objects.filter(username__in=usernames, is_active=True)}
+
+    # validate everything before writing anything
+    prepared = []
+    for n, item in enumerate(items):
+        form = TimesheetForm({'week_start': item.get('week_start'), 'additional_notes': item.get('additional_notes', '')})
+        if not form.is_valid():
+            raise ApiError(f'Item {n}: ' + '; '.join(f'{k}: {v[0]}' for k, v in form.errors.items()))
+        owner = request.user
+        if item.get('owner'):
+            if item['owner'] not in owners:
+                raise ApiError(f'Item {n}: unknown owner {item["owner"]}')
+            owner = owners[item['owner']]
+        prepared.append((form, owner, _clean_rows(item, n) or []))
+
+    with ledger.tracking([]) as created:
+        for form, owner, entries in prepared:
+            ts = form.save(commit=False)
+            ts.owner = owner
+            ts.save()
+            created.append(ts.pk)
+            save_rows(request.user, ts, entries)
+    return JsonResponse({'created': created}, status=201)
+
+
+def _bulk_update(request, items):
+    privileged = is_admin_or_accounting(request.user)
+    try:
+        ids = [int(item['id']) for item in items]
+    except (KeyError, TypeError, ValueError):
+        raise ApiError('Every item needs an integer id')
+    sheets = Timesheet.objects.select_related('owner').in_bulk(ids)
+
+    prepared = []
+    for n, item in enumerate(items):
+        ts = sheets.get(ids[n])
+        if ts is None:
+            raise ApiError(f'Item {n}: timesheet {ids[n]} not found', status=404)
+        # owner can edit within edit window; Admin/Accounting can always edit
+        if ts.owner_id != request.user.pk and not privileged:
+            raise ApiError(f'Item {n}: you do not have permission to edit timesheet {ts.pk}', status=403)
+        if not privileged and not timesheet_is_editable(ts):
+            raise ApiError(f'Item {n}: timesheet {ts.pk} is no longer editable', status=403)
+        notes = item.get('additional_notes')
+        if notes is not None and not isinstance(notes, str):
+            raise ApiError(f'Item {n}: additional_notes must be a string')
+        prepared.append((ts, notes, _clean_rows(item, n)))
+
+    with ledger.tracking([ts.pk for ts, _, entries in prepared if entries is not None]):
+        for ts, notes, entries in prepared:
+            if entries is not None:
+                ts.rows.all().delete()
+                save_rows(request.user, ts, entries)
+            if notes is not None:
+                ts.additional_notes = notes.strip()
+                ts.save()
+    return JsonResponse({'updated': [ts.pk for ts, _, _ in prepared]})
+
+
+@require_http_methods(['POST', 'PATCH'])
+@api_view
+def timesheet_bulk(request):
+    """POST creates timesheets, PATCH updates them; rows use the rows_json shape."""
+    items = _load_items(request)
+    if request.method == 'POST':
+        return _bulk_create(request, items)
+    return _bulk_update(request, items)
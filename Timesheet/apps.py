@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class TimesheetConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Timesheet'
+
+    def ready(self):
+        from django.db.models.signals import post_migrate
+        from .search import ensure_search_index
+        # connect signal receivers
+        from . import signals  # noqa: F401
+        post_migrate.connect(ensure_search_index, sender=self)
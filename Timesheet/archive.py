@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from . import ledger
+from .models import ArchivedTimesheet, Timesheet, TimesheetRow, DAY_FIELDS
+
+
+ROW_FIELDS = ['timesheet_id', 'employee_id', 'employee_name'] + DAY_FIELDS + ['jobsite_name', 'jobsite_num']
+
+
+def archivable_timesheets(before):
+    """Timesheets for weeks starting before `before` that are closed for editing.
+
+    A week is closed from the Monday after it, as in timesheet_is_editable.
+    """
+    last_closed_week = date.today() - timedelta(days=7)
+    return Timesheet.objects.filter(week_start__lt=before, week_start__lte=last_closed_week)
+
+
+def archive_timesheets(before, batch_size=200):
+    """Move closed timesheets before `before` into ArchivedTimesheet, one batch per transaction.
+
+    Returns the number of timesheets archived.
+    """
+    archived = 0
+    while True:
+        with transaction.atomic():
+            ids = list(archivable_timesheets(before).order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return archived
+            rows = {}
+            for values in TimesheetRow.objects.filter(timesheet_id__in=ids).order_by('pk').values(*ROW_FIELDS):
+                rows.setdefault(values.pop('timesheet_id'), []).append(values)
+            ArchivedTimesheet.objects.bulk_create([
+                ArchivedTimesheet(
+                    original_id=ts['pk'],
+                    owner_id=ts['owner_id'],
+                    created_at=ts['created_at'],
+                    week_start=ts['week_start'],
+                    additional_notes=ts['additional_notes'],
+                    rows_data=ArchivedTimesheet.pack_rows(rows.get(ts['pk'], [])),
+                )
+                for ts in Timesheet.objects.filter(pk__in=ids).values('pk', 'owner_id', 'created_at', 'week_start', 'additional_notes')
+            ])
+            # cascades to the rows; the hours were worked, so they stay in the ledger
+            with ledger.suspended():
+                Timesheet.objects.filter(pk__in=ids).delete()
+        archived += len(ids)
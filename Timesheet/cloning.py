@@ -0,0 +1,64 @@
+from django.db.models import OuterRef, Subquery
+
+from .models import Timesheet, TimesheetRow, DAY_FIELDS
+from .search import schedule_index
+from . import ledger
+
+
+def clone_latest_timesheets(owners, week_start, include_hours=False):
+    """Start week_start for each owner from their most recent earlier timesheet.
+
+    Owners that already have a timesheet for week_start, or that have never
+    submitted one before it, are skipped. Rows are copied with one SELECT and
+    one bulk INSERT regardless of how many owners are passed. Returns a dict
+    mapping owner id -> the new Timesheet.
+    """
+    owner_ids = [getattr(o, 'pk', o) for o in owners]
+    if not owner_ids:
+        return {}
+
+    already_started = Timesheet.objects.filter(owner_id__in=owner_ids, week_start=week_start).values('owner_id')
+    latest = Timesheet.objects.filter(
+        owner=OuterRef('owner'), week_start__lt=week_start
+    ).order_by('-week_start', '-created_at').values('pk')[:1]
+    sources = dict(
+        Timesheet.objects.filter(owner_id__in=owner_ids, pk=Subquery(latest))
+        .exclude(owner_id__in=already_started)
+        .values_list('pk', 'owner_id')
+    )
+    if not sources:
+        return {}
+
+    # copy employee and jobsite (and optionally hours); rows for soft-deleted
+    # employees are not carried into a new week
+    fields = ['timesheet_id', 'employee_id', 'employee_name', 'jobsite_name', 'jobsite_num']
+    if include_hours:
+        fields += DAY_FIELDS
+
+    with ledger.tracking([]) as tracked:
+        new_sheets = Timesheet.objects.bulk_create(
+            [Timesheet(owner_id=owner_id, week_start=week_start) for owner_id in sources.values()]
+        )
+        tracked.extend(ts.pk for ts in new_sheets)
+        by_owner = {ts.owner_id: ts for ts in new_sheets}
+        source_rows = (
+            TimesheetRow.objects.filter(timesheet_id__in=sources.keys())
+            .exclude(employee__is_active=False)
+            .order_by('timesheet_id', 'pk')
+            .values(*fields)
+        )
+        TimesheetRow.objects.bulk_create(
+            [
+                TimesheetRow(**{**values, 'timesheet_id': by_owner[sources[values['timesheet_id']]].pk})
+                for values in source_rows
+            ],
+            batch_size=500,
+        )
+        # bulk_create sends no signals, so queue the new sheets for the search index
+        schedule_index([ts.pk for ts in new_sheets])
+    return by_owner
+
+
+def clone_latest_timesheet(owner, week_start, include_hours=False):
+    """Clone owner's most recent timesheet into week_start; None if nothing was cloned."""
+    return clone_latest_timesheets([owner], week_start, include_hours=include_hours).get(owner.pk)
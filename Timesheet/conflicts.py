@@ -0,0 +1,50 @@
+from django.conf import settings
+
+from .models import TimesheetRow, DAY_FIELDS
+from .utils import parse_hours
+
+
+DAY_LABELS = ['Mon', 'Tues', 'Wed', 'Thur', 'Fri', 'Sat', 'Sun']
+
+
+def find_conflicts(week_start, employee_ids=None, daily_limit=None):
+    """Find crew members double-booked across timesheets for the week of week_start.
+
+    An employee conflicts when they appear on more than one timesheet for the
+    week, or when their hours for a day, summed across every timesheet, exceed
+    daily_limit (settings.TIMESHEET_DAILY_HOURS_LIMIT by default). employee_ids
+    may be a list or a queryset of ids to limit the check to.
+
+    Runs a single query over the (week_start, employee) rows. Returns a list of
+    dicts sorted by employee name, each with 'employee_id', 'employee_name',
+    'timesheets' (list of (timesheet id, owner username)) and 'over_limit'
+    (list of (day label, total hours)).
+    """
+    if daily_limit is None:
+        daily_limit = getattr(settings, 'TIMESHEET_DAILY_HOURS_LIMIT', 12)
+
+    rows = TimesheetRow.objects.filter(timesheet__week_start=week_start, employee__isnull=False)
+    if employee_ids is not None:
+        rows = rows.filter(employee_id__in=employee_ids)
+
+    by_employee = {}
+    for emp_id, name, ts_id, owner, *hours in rows.values_list(
+        'employee_id', 'employee__name', 'timesheet_id', 'timesheet__owner__username', *DAY_FIELDS
+    ):
+        entry = by_employee.setdefault(emp_id, {'name': name, 'timesheets': {}, 'totals': [0.0] * 7})
+        entry['timesheets'][ts_id] = owner
+        for d, value in enumerate(hours):
+            entry['totals'][d] += parse_hours(value) or 0
+
+    conflicts = []
+    for emp_id, entry in by_employee.items():
+        over_limit = [(DAY_LABELS[d], total) for d, total in enumerate(entry['totals']) if total > daily_limit]
+        if len(entry['timesheets']) > 1 or over_limit:
+            conflicts.append({
+                'employee_id': emp_id,
+                'employee_name': entry['name'],
+                'timesheets': sorted(entry['timesheets'].items()),
+                'over_limit': over_limit,
+            })
+    conflicts.sort(key=lambda c: c['employee_name'].lower())
+    return conflicts
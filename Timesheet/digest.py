@@ -0,0 +1,162 @@
+"""Monday digest email for foremen and Accounting.
+
+collect() gathers every recipient's data for a week with a fixed handful of
+set-based queries, however many recipients there are:
+
+- foremen (User group) get their submitted timesheets, their crew's hours from
+  the EmployeeWeekHours ledger, and crew members with no hours that week
+- Accounting gets the company totals, foremen with no timesheet, and crew
+  over TIMESHEET_WEEKLY_OVERTIME_HOURS
+
+send_weekly_digest() renders the messages in batches from one loaded template
+and sends them all over a single connection to the configured EMAIL_BACKEND.
+"""
+import logging
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Count
+from django.template.loader import get_template
+
+from .models import Employee, EmployeeWeekHours, Timesheet, TimesheetRow, DAY_FIELDS
+from .utils import parse_hours
+
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE = 'Timesheet/email/weekly_digest.txt'
+FOREMAN_GROUP = 'User'
+ACCOUNTING_GROUP = 'Accounting'
+
+
+def collect(week_start, usernames=None):
+    """Return a list of per-recipient digest contexts for the week of week_start.
+
+    Recipients are active users with an email address in the User or Accounting
+    group, optionally limited to usernames.
+    """
+    users = User.objects.filter(is_active=True, groups__name__in=[FOREMAN_GROUP, ACCOUNTING_GROUP]).exclude(email='')
+    if usernames:
+        users = users.filter(username__in=usernames)
+    recipients = {}
+    for pk, username, first_name, email, group in users.values_list('pk', 'username', 'first_name', 'email', 'groups__name'):
+        entry = recipients.setdefault(pk, {'username': username, 'name': first_name or username, 'email': email, 'groups': set()})
+        entry['groups'].add(group)
+
+    # every foreman, not just recipients: Accounting's missing list covers foremen without email too
+    foremen = dict(
+        User.objects.filter(is_active=True, groups__name=FOREMAN_GROUP).values_list('pk', 'username')
+    )
+
+    sheets = {}
+    for pk, owner_id, created_at, row_count in (
+        Timesheet.objects.filter(week_start=week_start).annotate(row_count=Count('rows'))
+        .values_list('pk', 'owner_id', 'created_at', 'row_count')
+    ):
+        sheets[pk] = {'id': pk, 'owner_id': owner_id, 'created_at': created_at, 'rows': row_count, 'hours': 0.0}
+    for ts_id, *days in TimesheetRow.objects.filter(timesheet__week_start=week_start).values_list('timesheet_id', *DAY_FIELDS):
+        sheets[ts_id]['hours'] += sum(parse_hours(v) or 0 for v in days)
+    sheets_by_owner = {}
+    for sheet in sorted(sheets.values(), key=lambda s: s['created_at']):
+        sheets_by_owner.setdefault(sheet['owner_id'], []).append(sheet)
+
+    week_hours = {
+        emp_id: (hours, ytd)
+        for emp_id, hours, ytd in EmployeeWeekHours.objects.filter(week_start=week_start).values_list('employee_id', 'hours', 'ytd_hours')
+    }
+    crews = {}
+    for user_id, emp_id, name in (
+        Employee.managers.through.objects.filter(user_id__in=recipients, employee__is_active=True)
+        .order_by('employee__name').values_list('user_id', 'employee_id', 'employee__name')
+    ):
+        hours, ytd = week_hours.get(emp_id, (None, None))
+        crews.setdefault(user_id, []).append({'id': emp_id, 'name': name, 'hours': hours, 'ytd_hours': ytd})
+
+    overtime_limit = Decimal(str(getattr(settings, 'TIMESHEET_WEEKLY_OVERTIME_HOURS', 40)))
+    company = None
+    if any(ACCOUNTING_GROUP in r['groups'] for r in recipients.values()):
+        overtime = list(
+            Employee.objects.filter(week_hours__week_start=week_start, week_hours__hours__gt=overtime_limit)
+            .order_by('name').values_list('name', 'week_hours__hours')
+        )
+        company = {
+            'sheets': len(sheets),
+            'hours': sum(s['hours'] for s in sheets.values()),
+            'foremen': len(foremen),
+            'submitted': len(set(foremen) & set(sheets_by_owner)),
+            'missing': sorted((foremen[pk] for pk in foremen if pk not in sheets_by_owner), key=str.lower),
+            'overtime': overtime,
+        }
+
+    digests = []
+    for pk, recipient in recipients.items():
+        is_foreman = FOREMAN_GROUP in recipient['groups']
+        crew = crews.get(pk, []) if is_foreman else []
+        digests.append({
+            **recipient,
+            'week_start': week_start,
+            'is_foreman': is_foreman,
+            'is_accounting': ACCOUNTING_GROUP in recipient['groups'],
+            'sheets': sheets_by_owner.get(pk, []),
+            'crew': crew,
+            'crew_without_hours': [member['name'] for member in crew if not member['hours']],
+            'company': company,
+            'overtime_limit': overtime_limit,
+        })
+    return digests
+
+
+def render_messages(digests, template=None):
+    """Render one EmailMessage per digest, loading the template once."""
+    template = template or get_template(TEMPLATE)
+    return [
+        EmailMessage(
+            subject=f'Timesheet digest for the week of {digest["week_start"]:%b %d, %Y}',
+            body=template.render(digest),
+            to=[digest['email']],
+        )
+        for digest in digests
+    ]
+
+
+def send_weekly_digest(week_start, usernames=None, batch_size=200, dry_run=False):
+    """Collect, render and send the digest; returns a dict of counts and timings."""
+    started = time.perf_counter()
+    digests = collect(week_start, usernames=usernames)
+    collected = time.perf_counter()
+
+    template = get_template(TEMPLATE)
+    sent = 0
+    rendering = 0.0
+    # one connection for the whole run; send_messages reuses it while it is open
+    connection = get_connection(fail_silently=False)
+    if not dry_run:
+        connection.open()
+    try:
+        for start in range(0, len(digests), batch_size):
+            batch_started = time.perf_counter()
+            messages = render_messages(digests[start:start + batch_size], template)
+            rendering += time.perf_counter() - batch_started
+            if not dry_run:
+                sent += connection.send_messages(messages) or 0
+    finally:
+        if not dry_run:
+            connection.close()
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        'recipients': len(digests),
+        'sent': sent,
+        'collect_seconds': collected - started,
+        'render_seconds': rendering,
+        'seconds': elapsed,
+        'per_second': len(digests) / elapsed if elapsed else 0,
+    }
+    logger.info(
+        'Weekly digest for %s: %d recipients, %d sent in %.2fs (%.0f/s; collect %.2fs, render %.2fs)',
+        week_start, stats['recipients'], sent, elapsed, stats['per_second'], stats['collect_seconds'], rendering,
+    )
+    return stats
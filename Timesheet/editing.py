@@ -0,0 +1,68 @@
+"""Timesheet editing rules shared by the HTML views and the JSON API."""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+
+from .models import Employee, TimesheetRow, DAY_FIELDS
+from .roles import is_admin_or_accounting
+from .search import schedule_index
+
+
+def timesheet_is_editable(ts):
+    """Return True if current date is before the Monday after ts.week_start."""
+    # ts.week_start is a date for the Monday of the timesheet
+    next_monday = ts.week_start + timedelta(days=7)
+    today = date.today()
+    return today < next_monday
+
+
+def save_rows(user, ts, entries):
+    """Create TimesheetRows for ts from entries, as entered by user; return how many were saved."""
+    privileged = is_admin_or_accounting(user)
+
+    # resolve every referenced crew member / user in one query each instead of per row
+    employee_ids = {int(e[0]) for e in entries if e[0].isdigit()}
+    employees = Employee.objects.filter(pk__in=employee_ids)
+    if not privileged:
+        # regular users may only pick members of their own crew
+        employees = employees.filter(managers=user)
+    employees = {e.pk: e for e in employees}
+    members = {}
+    if privileged:
+        usernames = {e[0] for e in entries if e[0] and not e[0].isdigit() and e[0] not in ('self', ts.owner.username)}
+        if usernames:
+            members = {u.username: u for u in User.objects.filter(username__in=usernames, groups__name='User')}
+
+    rows = []
+    for entry in entries:
+        emp_val, hours, jobsite_name, jobsite_num = entry[0], entry[1:8], entry[8], entry[9]
+        # if no employee selected and no hours, skip
+        if not emp_val and not any(hours):
+            continue
+
+        row = TimesheetRow(timesheet=ts, jobsite_name=jobsite_name, jobsite_num=jobsite_num)
+        if emp_val.isdigit():
+            row.employee = employees.get(int(emp_val))
+            row.employee_name = row.employee.name if row.employee else ''
+        elif emp_val == 'self' or emp_val == ts.owner.username:
+            row.employee_name = ts.owner.get_full_name() or ts.owner.username
+        elif emp_val in members:
+            # Only Admin/Accounting may select other users from the 'User' group.
+            member = members[emp_val]
+            row.employee_name = member.get_full_name() or member.username
+        else:
+            # Regular users cannot pick other usernames as employees — treat as literal text.
+            row.employee_name = emp_val
+
+        # hours are raw strings so values like 'Vaca' or 'Sick' are allowed
+        for fld, val in zip(DAY_FIELDS, hours):
+            setattr(row, fld, val)
+
+        # only save non-empty rows (any hours or jobsite or employee name)
+        if row.employee_name or row.jobsite_name or row.jobsite_num or any(hours):
+            rows.append(row)
+
+    TimesheetRow.objects.bulk_create(rows)
+    # bulk_create sends no signals, so refresh the jobsite search text explicitly
+    schedule_index([ts.pk])
+    return len(rows)
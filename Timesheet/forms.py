@@ -1,8 +1,24 @@
+import json
+
 from django import forms
-from .models import Employee, Timesheet
+from django.conf import settings
+from .models import Employee, Timesheet, TimesheetRow, DAY_FIELDS
+from .utils import hours_error
 from django.contrib.auth.models import User, Group
 
 
+# Column order of one row in the compact rows_json payload
+ROW_COLUMNS = ['employee'] + DAY_FIELDS + ['jobsite_name', 'jobsite_num']
+
+
+def max_timesheet_rows():
+    return getattr(settings, 'TIMESHEET_MAX_ROWS', 100)
+
+
+def max_bulk_upload_users():
+    return getattr(settings, 'TIMESHEET_BULK_UPLOAD_MAX_USERS', 25)
+
+
 class EmployeeForm(forms.ModelForm):
     class Meta:
         model = Employee
@@ -18,6 +34,102 @@ class TimesheetForm(forms.ModelForm):
         }
 
 
+class TimesheetRowsForm(forms.Form):
+    """Compact JSON submission of a timesheet grid.
+
+    rows_json is an array of rows, each an array of ROW_COLUMNS strings:
+    [employee, mon, tues, wed, thur, fri, sat, sun, jobsite_name, jobsite_num].
+    Cleans to a list of lists of stripped strings.
+    """
+    rows_json = forms.CharField(required=False)
+
+    def clean_rows_json(self):
+        raw = self.cleaned_data.get('rows_json') or '[]'
+        try:
+            rows = json.loads(raw)
+        except ValueError:
+            raise forms.ValidationError('Rows payload is not valid JSON')
+        if not isinstance(rows, list):
+            raise forms.ValidationError('Rows payload must be an array')
+        limit = max_timesheet_rows()
+        if len(rows) > limit:
+            raise forms.ValidationError(f'A timesheet can have at most {limit} rows')
+
+        max_lengths = [200] + [TimesheetRow._meta.get_field(f).max_length for f in ROW_COLUMNS[1:]]
+        cleaned = []
+        for n, row in enumerate(rows, start=1):
+            if not isinstance(row, list) or len(row) != len(ROW_COLUMNS):
+                raise forms.ValidationError(f'Row {n} must be an array of {len(ROW_COLUMNS)} values')
+            values = []
+            for column, value, max_length in zip(ROW_COLUMNS, row, max_lengths):
+                if value is None:
+                    value = ''
+                if not isinstance(value, str):
+                    raise forms.ValidationError(f'Row {n}: {column} must be a string')
+                value = value.strip()
+                if len(value) > max_length:
+                    raise forms.ValidationError(f'Row {n}: {column} is longer than {max_length} characters')
+                error = hours_error(value) if column in DAY_FIELDS else None
+                if error:
+                    raise forms.ValidationError(f'Row {n}: {column} {error}')
+                values.append(value)
+            cleaned.append(values)
+        return cleaned
+
+
+class TimesheetSearchForm(forms.Form):
+    owner = forms.CharField(required=False, label='Submitted by')
+    date_from = forms.DateField(required=False, label='Week from', widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(required=False, label='Week to', widget=forms.DateInput(attrs={'type': 'date'}))
+    employee = forms.CharField(required=False)
+    jobsite_num = forms.CharField(required=False, label='Job site number')
+    q = forms.CharField(required=False, label='Text', help_text='Searches job site names and notes')
+
+
+def _rule_choices():
+    # evaluated when the form is built, so importing forms doesn't load pandas
+    from .analytics import RULES
+    return [('', 'All checks')] + list(RULES.items())
+
+
+class ExceptionsReportForm(forms.Form):
+    date_from = forms.DateField(required=False, label='Week from', widget=forms.DateInput(attrs={'type': 'date'}))
+    date_to = forms.DateField(required=False, label='Week to', widget=forms.DateInput(attrs={'type': 'date'}))
+    rule = forms.ChoiceField(required=False, choices=_rule_choices)
+    daily_limit = forms.FloatField(required=False, min_value=0, label='Daily limit (h)')
+    weekly_limit = forms.FloatField(required=False, min_value=0, label='Weekly limit (h)')
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get('date_from') and cleaned.get('date_to') and cleaned['date_from'] > cleaned['date_to']:
+            raise forms.ValidationError('Week from must be on or before week to')
+        return cleaned
+
+
+class BulkProvisionForm(forms.Form):
+    csv_file = forms.FileField(label='CSV file')
+
+    def clean_csv_file(self):
+        from . import provisioning
+
+        upload = self.cleaned_data['csv_file']
+        try:
+            text = upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise forms.ValidationError('The file must be UTF-8 encoded CSV')
+        try:
+            plan = provisioning.parse(text)
+        except provisioning.ProvisioningError as exc:
+            raise forms.ValidationError(exc.errors)
+        limit = max_bulk_upload_users()
+        if len(plan['users']) > limit:
+            raise forms.ValidationError(
+                f'This file creates {len(plan["users"])} users; uploads here are limited to {limit}. '
+                f'Run "python manage.py provision_users FILE" on the server for larger files.'
+            )
+        return plan
+
+
 class UserCreateForm(forms.ModelForm):
     password = forms.CharField(widget=forms.PasswordInput, required=True)
     groups = forms.ModelMultipleChoiceField(queryset=Group.objects.all(), required=False)
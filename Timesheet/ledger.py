@@ -0,0 +1,157 @@
+"""Incremental maintenance of the EmployeeWeekHours ledger.
+
+The views, the API and copy-forward wrap their row changes in tracking(): the
+per-(employee, week) hours of the affected timesheets are summed before and after,
+and only the difference is applied to the ledger. Everything else that changes
+rows (the admin, deleting a user or a timesheet and its cascades) is caught by the
+model signal handlers in signals.py, which apply the same kind of difference per
+row. Inside tracking() those handlers stand aside so nothing is counted twice.
+
+Timesheets moved to the archive keep their ledger entries because the hours were
+still worked; deleting an archived timesheet takes its hours back out.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import ArchivedTimesheet, EmployeeWeekHours, TimesheetRow, DAY_FIELDS
+from .utils import plausible_hours
+
+
+CENTS = Decimal('0.01')
+# set while a caller accounts for its own row changes, so the signal handlers skip them
+_suspended = ContextVar('ledger_suspended', default=False)
+
+
+def _to_decimal(hours):
+    return Decimal(str(hours)).quantize(CENTS)
+
+
+def week_total(days):
+    """Sum a row's day cells as Decimal hours.
+
+    Cells that aren't a possible day's work (see utils.plausible_hours) count as
+    no hours. Forms reject them, but older rows or admin edits may still hold them.
+    """
+    return _to_decimal(sum(plausible_hours(v) or 0 for v in days))
+
+
+def row_hours(rows):
+    """Return {(employee_id, week_start): Decimal hours} for a TimesheetRow queryset (one query)."""
+    totals = {}
+    for emp_id, week_start, *days in rows.filter(employee__isnull=False).values_list(
+        'employee_id', 'timesheet__week_start', *DAY_FIELDS
+    ):
+        hours = week_total(days)
+        if hours:
+            key = (emp_id, week_start)
+            totals[key] = totals.get(key, Decimal(0)) + hours
+    return totals
+
+
+def timesheet_hours(ts_ids):
+    """Return {(employee_id, week_start): Decimal hours} for the rows of ts_ids (one query)."""
+    return row_hours(TimesheetRow.objects.filter(timesheet_id__in=ts_ids))
+
+
+def archived_hours(archived):
+    """Return {(employee_id, week_start): Decimal hours} for an ArchivedTimesheet's rows."""
+    totals = {}
+    for row in archived.rows:
+        hours = week_total([row[d] for d in DAY_FIELDS])
+        if row['employee_id'] and hours:
+            key = (row['employee_id'], archived.week_start)
+            totals[key] = totals.get(key, Decimal(0)) + hours
+    return totals
+
+
+def apply_deltas(deltas):
+    """Add {(employee_id, week_start): Decimal} deltas to the ledger, keeping ytd_hours in step."""
+    for (emp_id, week_start), delta in deltas.items():
+        if not delta:
+            continue
+        year_start = date(week_start.year, 1, 1)
+        next_year = date(week_start.year + 1, 1, 1)
+        if not EmployeeWeekHours.objects.filter(employee_id=emp_id, week_start=week_start).exists():
+            # a new week starts from the running total of the previous week in the same year
+            previous = EmployeeWeekHours.objects.filter(
+                employee_id=emp_id, week_start__gte=year_start, week_start__lt=week_start
+            ).order_by('-week_start').values_list('ytd_hours', flat=True).first()
+            EmployeeWeekHours.objects.create(employee_id=emp_id, week_start=week_start, ytd_hours=previous or 0)
+        EmployeeWeekHours.objects.filter(employee_id=emp_id, week_start=week_start).update(hours=F('hours') + delta)
+        EmployeeWeekHours.objects.filter(
+            employee_id=emp_id, week_start__gte=week_start, week_start__lt=next_year
+        ).update(ytd_hours=F('ytd_hours') + delta)
+        # a week whose hours were all removed drops out, as it would after rebuild()
+        EmployeeWeekHours.objects.filter(employee_id=emp_id, week_start=week_start, hours=0).delete()
+
+
+def apply_difference(before, after):
+    """Apply the change from one {(employee_id, week_start): hours} total to another."""
+    keys = set(before) | set(after)
+    apply_deltas({key: after.get(key, Decimal(0)) - before.get(key, Decimal(0)) for key in keys})
+
+
+def is_suspended():
+    return _suspended.get()
+
+
+@contextmanager
+def suspended():
+    """Make the signal handlers ignore row changes in the block; the caller accounts for them."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+@contextmanager
+def tracking(ts_ids):
+    """Apply the ledger delta of whatever the block does to the rows of ts_ids.
+
+    Timesheets created inside the block can be added to the yielded list.
+    """
+    ts_ids = list(ts_ids)
+    with transaction.atomic(), suspended():
+        before = timesheet_hours(ts_ids)
+        yield ts_ids
+        apply_difference(before, timesheet_hours(ts_ids))
+
+
+def rebuild():
+    """Recompute the whole ledger from TimesheetRows and archived timesheets.
+
+    Returns the number of ledger rows written.
+    """
+    weekly = {}
+
+    def add(emp_id, week_start, days):
+        hours = week_total(days)
+        if emp_id and hours:
+            key = (emp_id, week_start)
+            weekly[key] = weekly.get(key, Decimal(0)) + hours
+
+    rows = TimesheetRow.objects.filter(employee__isnull=False)
+    for emp_id, week_start, *days in rows.values_list('employee_id', 'timesheet__week_start', *DAY_FIELDS).iterator():
+        add(emp_id, week_start, days)
+    # archived timesheets still count towards the ledger
+    for archived in ArchivedTimesheet.objects.only('week_start', 'rows_data').iterator():
+        for row in archived.rows:
+            add(row['employee_id'], archived.week_start, [row[d] for d in DAY_FIELDS])
+
+    entries = []
+    running = {}
+    for (emp_id, week_start), hours in sorted(weekly.items()):
+        year_key = (emp_id, week_start.year)
+        running[year_key] = running.get(year_key, Decimal(0)) + hours
+        entries.append(EmployeeWeekHours(employee_id=emp_id, week_start=week_start, hours=hours, ytd_hours=running[year_key]))
+
+    with transaction.atomic():
+        EmployeeWeekHours.objects.all().delete()
+        EmployeeWeekHours.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
@@ -0,0 +1,163 @@
+"""Routine database upkeep used by the maintain command.
+
+Everything here is written to be safe while people are using the site: rows
+are deleted in small batches, each in its own short transaction, and the
+database statistics/space steps avoid long exclusive locks unless asked.
+"""
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+
+def purge_in_batches(queryset, batch_size=500, pause=0.05):
+    """Delete queryset's rows batch_size at a time; returns the number deleted.
+
+    Each batch is a separate transaction (autocommit), with a short pause in
+    between so timesheet writers can take the write lock.
+    """
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += model._base_manager.filter(pk__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            return deleted
+        time.sleep(pause)
+
+
+def purge_access_attempts(batch_size=500, pause=0.05):
+    """Delete axes AccessAttempt rows whose cool-off (AXES_COOLOFF_TIME) has passed.
+
+    Returns the number deleted, or None when no cool-off is configured (lockouts
+    are then permanent until an admin unlocks the user, so nothing expires).
+    """
+    from axes.helpers import get_cool_off
+    from axes.models import AccessAttempt
+
+    cool_off = get_cool_off()
+    if not cool_off:
+        return None
+    expired = AccessAttempt.objects.filter(attempt_time__lt=timezone.now() - cool_off)
+    return purge_in_batches(expired, batch_size, pause)
+
+
+def purge_expired_sessions(batch_size=500, pause=0.05):
+    """Delete expired sessions; returns the number deleted, or None if not countable.
+
+    Database-backed engines are purged in batches; other engines use their own
+    clear_expired(). Raises NotImplementedError for engines with no server-side
+    storage (signed cookies).
+    """
+    from django.contrib.sessions.backends.db import SessionStore as DatabaseSessionStore
+
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    if issubclass(store, DatabaseSessionStore):
+        expired = store.get_model_class().objects.filter(expire_date__lt=timezone.now())
+        return purge_in_batches(expired, batch_size, pause)
+    store.clear_expired()
+    return None
+
+
+def table_sizes():
+    """Return [(table, rows, bytes or None)] for the project's tables, largest first."""
+    tables = sorted(connection.introspection.django_table_names(only_existing=True, include_views=False))
+    sizes = {}
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT relname, n_live_tup, pg_total_relation_size(relid) FROM pg_stat_user_tables WHERE relname = ANY(%s)',
+                [tables],
+            )
+            return sorted(cursor.fetchall(), key=lambda t: -t[2])
+        if connection.vendor == 'sqlite':
+            try:
+                # dbstat is only present when SQLite was built with it; sizes include the table's indexes
+                cursor.execute(
+                    'SELECT COALESCE(m.tbl_name, s.name), SUM(s.pgsize) FROM dbstat s '
+                    'LEFT JOIN sqlite_master m ON m.name = s.name GROUP BY 1'
+                )
+                sizes = dict(cursor.fetchall())
+            except DatabaseError:
+                sizes = {}
+        result = []
+        for table in tables:
+            cursor.execute(f'SELECT COUNT(*) FROM {connection.ops.quote_name(table)}')
+            result.append((table, cursor.fetchone()[0], sizes.get(table)))
+    return sorted(result, key=lambda t: (-(t[2] or 0), -t[1]))
+
+
+def optimize_sqlite(vacuum=False, vacuum_threshold=0.2):
+    """Refresh planner statistics and reclaim space; returns a list of report lines.
+
+    ANALYZE and a passive WAL checkpoint only hold locks briefly. VACUUM
+    rewrites the whole file under an exclusive lock, so it only runs when asked
+    for and when at least vacuum_threshold of the file is free pages.
+    """
+    report = []
+    with connection.cursor() as cursor:
+        # sample at most this many index entries per index so ANALYZE stays quick on big tables
+        cursor.execute('PRAGMA analysis_limit = 1000')
+        cursor.execute('ANALYZE')
+        report.append('ANALYZE: statistics refreshed')
+
+        cursor.execute('PRAGMA page_count')
+        page_count = cursor.fetchone()[0]
+        cursor.execute('PRAGMA freelist_count')
+        free = cursor.fetchone()[0]
+        cursor.execute('PRAGMA page_size')
+        page_size = cursor.fetchone()[0]
+        ratio = free / page_count if page_count else 0
+        report.append(f'File: {page_count * page_size / 1024:.0f} KiB, {free * page_size / 1024:.0f} KiB free ({ratio:.0%})')
+
+        if vacuum and ratio >= vacuum_threshold:
+            cursor.execute('VACUUM')
+            cursor.execute('PRAGMA page_count')
+            report.append(f'VACUUM: file is now {cursor.fetchone()[0] * page_size / 1024:.0f} KiB')
+        elif vacuum:
+            report.append(f'VACUUM skipped: free space below {vacuum_threshold:.0%}')
+
+        cursor.execute('PRAGMA journal_mode')
+        if cursor.fetchone()[0] == 'wal':
+            # PASSIVE never waits on readers or writers; it copies what it can
+            cursor.execute('PRAGMA wal_checkpoint(PASSIVE)')
+            busy, log_frames, checkpointed = cursor.fetchone()
+            report.append(f'WAL checkpoint: {checkpointed} of {log_frames} frames')
+    return report
+
+
+def optimize_postgresql(dead_ratio=0.2, reindex=False):
+    """VACUUM ANALYZE (and optionally REINDEX CONCURRENTLY) tables pg_stat shows as bloated.
+
+    A table qualifies when its dead tuples exceed dead_ratio of its live ones, or
+    it has never been analyzed. Neither VACUUM nor REINDEX CONCURRENTLY blocks
+    reads or writes. Returns a list of report lines.
+    """
+    tables = connection.introspection.django_table_names(only_existing=True, include_views=False)
+    report = []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relname, n_live_tup, n_dead_tup, COALESCE(last_analyze, last_autoanalyze) IS NULL '
+            'FROM pg_stat_user_tables WHERE relname = ANY(%s)',
+            [list(tables)],
+        )
+        stale = [
+            (table, live, dead, never_analyzed)
+            for table, live, dead, never_analyzed in cursor.fetchall()
+            if never_analyzed or dead > max(live, 1) * dead_ratio
+        ]
+        for table, live, dead, never_analyzed in stale:
+            name = connection.ops.quote_name(table)
+            cursor.execute(f'VACUUM (ANALYZE) {name}')
+            line = f'VACUUM ANALYZE {table}: {dead} dead / {live} live tuples'
+            if reindex and dead:
+                cursor.execute(f'REINDEX TABLE CONCURRENTLY {name}')
+                line += ', reindexed'
+            report.append(line)
+    if not stale:
+        report.append(f'No tables above {dead_ratio:.0%} dead tuples')
+    return report
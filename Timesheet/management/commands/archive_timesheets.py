@@ -0,0 +1,30 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Timesheet.archive import archivable_timesheets, archive_timesheets
+
+
+class Command(BaseCommand):
+    help = 'Move closed timesheets for weeks before --before into the compressed archive table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--before', required=True, help='Archive weeks starting before this date (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, default=200, help='Timesheets moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many timesheets would be archived')
+
+    def handle(self, *args, **options):
+        try:
+            before = datetime.strptime(options['before'], '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError('--before must be a date in YYYY-MM-DD format')
+
+        if options['dry_run']:
+            count = archivable_timesheets(before).count()
+            self.stdout.write(self.style.NOTICE(f'{count} timesheets would be archived'))
+            return
+
+        start = time.perf_counter()
+        count = archive_timesheets(before, batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f'Archived {count} timesheets in {time.perf_counter() - start:.1f}s'))
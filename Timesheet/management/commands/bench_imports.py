@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# what a gunicorn worker imports before serving its first page: the WSGI app
+# (settings, apps, middleware), the URLconf (views, api, forms) and the context processors
+BOOT_CODE = (
+    'import Intranet_Project.wsgi, Timesheet.urls, Timesheet.context_processors'
+)
+# the cost no project code can avoid: Django and the installed apps' models under
+# the same settings; timed on the same machine so the budget doesn't depend on its speed
+BASELINE_CODE = 'import django; django.setup()'
+# heavy modules that must only load when a feature that needs them is used
+FORBIDDEN = ['pandas', 'numpy']
+
+
+def measure(code, settings_module):
+    """Run code under `python -X importtime` in a fresh interpreter.
+
+    Returns (total microseconds, {module: (self us, cumulative us)}).
+    """
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise CommandError(f'Import failed:\n{result.stderr[-2000:]}')
+    modules = {}
+    for line in result.stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return sum(self_us for self_us, _ in modules.values()), modules
+
+
+class Command(BaseCommand):
+    help = 'Measure what worker boot imports on top of django.setup() with python -X importtime and fail above a budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget', type=float, default=150,
+            help='Maximum milliseconds boot may add to a bare django.setup() timed on the same machine',
+        )
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time each way; the fastest counts')
+        parser.add_argument('--top', type=int, default=15, help='Slowest added modules to list')
+
+    def handle(self, *args, **options):
+        settings_module = os.environ.get('DJANGO_SETTINGS_MODULE', 'Intranet_Project.settings')
+        # alternate the two so a busy moment on the machine affects both alike; the
+        # first runs also warm the bytecode cache, as a deployed worker would have it
+        baselines, boots = [], []
+        for _ in range(max(1, options['runs'])):
+            baselines.append(measure(BASELINE_CODE, settings_module))
+            boots.append(measure(BOOT_CODE, settings_module))
+        baseline_total, baseline_modules = min(baselines, key=lambda run: run[0])
+        total, modules = min(boots, key=lambda run: run[0])
+        added = {name: times for name, times in modules.items() if name not in baseline_modules}
+        overhead = max(0, total - baseline_total)
+
+        self.stdout.write(f'{"self ms":>9} {"cumul ms":>9}  module (imported by boot, not by django.setup())')
+        for name, (self_us, cumulative_us) in sorted(added.items(), key=lambda m: -m[1][0])[:options['top']]:
+            self.stdout.write(f'{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {name}')
+
+        problems = []
+        loaded = [name for name in FORBIDDEN if name in modules]
+        if loaded:
+            problems.append(f'heavy modules imported at boot: {", ".join(loaded)}')
+        if overhead / 1000 > options['budget']:
+            problems.append(f'{overhead / 1000:.0f}ms added exceeds the {options["budget"]:.0f}ms budget')
+        summary = (
+            f'boot imports {len(modules)} modules in {total / 1000:.0f}ms, '
+            f'{overhead / 1000:.0f}ms over django.setup() ({baseline_total / 1000:.0f}ms; fastest of {len(boots)} runs each)'
+        )
+        if problems:
+            raise CommandError(f'{summary}; ' + '; '.join(problems))
+        self.stdout.write(self.style.SUCCESS(f'{summary}, within the {options["budget"]:.0f}ms budget'))
@@ -0,0 +1,80 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import Group, User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from Timesheet.models import Timesheet
+
+
+WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+HOST = 'localhost'
+PASSWORD = 'bench-password'
+
+
+def count_writes(queries):
+    return sum(1 for q in queries if q['sql'].lstrip().upper().startswith(WRITE_PREFIXES))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark database reads and writes per page view and per login for each session profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=50, help='Page views per profile')
+
+    def handle(self, *args, **options):
+        # run against a throwaway test database so the real one is never touched
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(ALLOWED_HOSTS=[HOST]):
+                self._run(max(1, options['views']))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _views(self, client, url, views):
+        # first view warms the session cache for cached_db
+        client.get(url, secure=True, HTTP_HOST=HOST)
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            for _ in range(views):
+                client.get(url, secure=True, HTTP_HOST=HOST)
+            elapsed = time.perf_counter() - start
+        # captured_queries slices the connection's query log when read, so copy it now
+        return list(ctx.captured_queries), elapsed
+
+    def _run(self, views):
+        user = User.objects.create_user('bench-foreman', password=PASSWORD)
+        user.groups.add(Group.objects.get_or_create(name='User')[0])
+        for week in range(20):
+            Timesheet.objects.create(owner=user, week_start=f'2025-{(week % 12) + 1:02d}-01')
+
+        url = reverse('Timesheet:dashboard')
+        login_url = reverse('Timesheet:login')
+        # queries/view and writes/view: plain page views (sessions are only saved when modified);
+        # writes/view*: with SESSION_SAVE_EVERY_REQUEST, which re-saves the session on every view
+        # to slide its expiry; writes/login: one POST to the login page
+        self.stdout.write(
+            f'{"session engine":<16}{"queries/view":>14}{"writes/view":>13}{"writes/view*":>14}{"writes/login":>14}{"ms/view":>10}'
+        )
+        for profile, engine in settings.SESSION_ENGINES.items():
+            with override_settings(SESSION_ENGINE=engine):
+                client = Client()
+                with CaptureQueriesContext(connection) as ctx:
+                    response = client.post(
+                        login_url, {'username': user.username, 'password': PASSWORD}, secure=True, HTTP_HOST=HOST,
+                    )
+                login_queries = list(ctx.captured_queries)
+                if response.status_code != 302:
+                    self.stderr.write(f'{profile}: login failed ({response.status_code})')
+                    continue
+                queries, elapsed = self._views(client, url, views)
+                with override_settings(SESSION_SAVE_EVERY_REQUEST=True):
+                    saving_queries, _ = self._views(client, url, views)
+            self.stdout.write(
+                f'{profile:<16}{len(queries) / views:>14.1f}{count_writes(queries) / views:>13.2f}'
+                f'{count_writes(saving_queries) / views:>14.2f}{count_writes(login_queries):>14}{elapsed * 1000 / views:>10.1f}'
+            )
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management.base import BaseCommand
+
+from Timesheet.maintenance import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Remove expired sessions and expired file-cache entries'
+
+    def handle(self, *args, **options):
+        try:
+            removed = purge_expired_sessions()
+            self.stdout.write(self.style.SUCCESS('Cleared expired sessions' if removed is None else f'Removed {removed} expired sessions'))
+        except NotImplementedError:
+            # signed-cookie sessions live in the browser; nothing to clear server-side
+            self.stdout.write(self.style.NOTICE(f'{settings.SESSION_ENGINE} does not store sessions server-side'))
+
+        for alias in settings.CACHES:
+            cache = caches[alias]
+            if not isinstance(cache, FileBasedCache):
+                continue
+            # FileBasedCache only drops expired files when they are read; _is_expired()
+            # deletes the file as a side effect
+            files = cache._list_cache_files()
+            removed = 0
+            for fname in files:
+                try:
+                    with open(fname, 'rb') as f:
+                        removed += cache._is_expired(f)
+                except FileNotFoundError:
+                    # already removed by a worker reading it
+                    pass
+            self.stdout.write(self.style.SUCCESS(f'Removed {removed} of {len(files)} entries from cache {alias!r}'))
+
+        self.stdout.write(self.style.SUCCESS('Done'))
@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from Timesheet import maintenance
+
+
+def _size(num_bytes):
+    if num_bytes is None:
+        return '-'
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if num_bytes < 1024 or unit == 'GiB':
+            return f'{num_bytes:.0f} {unit}' if unit == 'B' else f'{num_bytes:.1f} {unit}'
+        num_bytes /= 1024
+
+
+class Command(BaseCommand):
+    help = 'Purge expired login attempts and sessions, refresh database statistics and report table sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.05, help='Seconds to wait between delete batches')
+        parser.add_argument('--vacuum', action='store_true',
+                            help='SQLite: VACUUM when enough of the file is free pages (takes an exclusive lock; run off-hours)')
+        parser.add_argument('--vacuum-threshold', type=float, default=0.2, help='SQLite: free-page fraction that triggers --vacuum')
+        parser.add_argument('--dead-ratio', type=float, default=0.2, help='PostgreSQL: dead/live tuple ratio that triggers VACUUM ANALYZE')
+        parser.add_argument('--reindex', action='store_true', help='PostgreSQL: also REINDEX CONCURRENTLY the tables that were vacuumed')
+
+    def handle(self, *args, **options):
+        batch = {'batch_size': max(1, options['batch_size']), 'pause': max(0.0, options['pause'])}
+        started = time.perf_counter()
+
+        step = time.perf_counter()
+        attempts = maintenance.purge_access_attempts(**batch)
+        if attempts is None:
+            self.stdout.write(self.style.NOTICE('Login attempts: AXES_COOLOFF_TIME is not set, nothing expires'))
+        else:
+            self.stdout.write(f'Login attempts: removed {attempts} past the cool-off ({time.perf_counter() - step:.2f}s)')
+
+        step = time.perf_counter()
+        try:
+            sessions = maintenance.purge_expired_sessions(**batch)
+            removed = 'expired sessions cleared' if sessions is None else f'removed {sessions} expired'
+            self.stdout.write(f'Sessions: {removed} ({time.perf_counter() - step:.2f}s)')
+        except NotImplementedError:
+            self.stdout.write(self.style.NOTICE('Sessions: engine does not store sessions server-side'))
+
+        step = time.perf_counter()
+        if connection.vendor == 'sqlite':
+            report = maintenance.optimize_sqlite(vacuum=options['vacuum'], vacuum_threshold=options['vacuum_threshold'])
+        elif connection.vendor == 'postgresql':
+            report = maintenance.optimize_postgresql(dead_ratio=options['dead_ratio'], reindex=options['reindex'])
+        else:
+            report = [f'No statistics maintenance for {connection.vendor}']
+        for line in report:
+            self.stdout.write(f'Database: {line}')
+        self.stdout.write(f'Database: done in {time.perf_counter() - step:.2f}s')
+
+        self.stdout.write(f'\n{"table":<40} {"rows":>10} {"size":>12}')
+        for table, rows, size in maintenance.table_sizes():
+            self.stdout.write(f'{table:<40} {rows:>10} {_size(size):>12}')
+
+        self.stdout.write(self.style.SUCCESS(f'Maintenance finished in {time.perf_counter() - started:.2f}s'))
@@ -0,0 +1,52 @@
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Timesheet import analytics
+
+
+def _date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'{value!r} is not a date in YYYY-MM-DD format')
+
+
+class Command(BaseCommand):
+    help = 'Check a period of timesheets for long shifts, overtime, weekend work and non-numeric entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', help='First week (YYYY-MM-DD), default four weeks ago')
+        parser.add_argument('--to', dest='date_to', help='Last week (YYYY-MM-DD), default the current week')
+        parser.add_argument('--rule', action='append', choices=list(analytics.RULES), help='Only run this check (repeatable)')
+        parser.add_argument('--daily-limit', type=float, help='Hours per day before a shift is flagged (default TIMESHEET_DAILY_HOURS_LIMIT)')
+        parser.add_argument('--weekly-limit', type=float, help='Hours per week before overtime is flagged (default TIMESHEET_WEEKLY_OVERTIME_HOURS)')
+        parser.add_argument('--csv', help='Write the exceptions to this CSV file ("-" for stdout) instead of a summary')
+
+    def handle(self, *args, **options):
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+        date_from = _date(options['date_from']) if options['date_from'] else week_start - timedelta(weeks=3)
+        date_to = _date(options['date_to']) if options['date_to'] else week_start
+        if date_from > date_to:
+            raise CommandError('--from must be on or before --to')
+
+        started = time.perf_counter()
+        exceptions = analytics.find_exceptions(
+            date_from, date_to,
+            daily_limit=options['daily_limit'], weekly_limit=options['weekly_limit'], rules=options['rule'],
+        )
+        elapsed = time.perf_counter() - started
+
+        if options['csv']:
+            exceptions = exceptions.assign(timesheets=exceptions['timesheets'].map(lambda sheets: ' '.join(str(ts_id) for ts_id, _ in sheets)))
+            exceptions.drop(columns='label').to_csv(sys.stdout if options['csv'] == '-' else options['csv'], index=False)
+        else:
+            for e in analytics.as_records(exceptions):
+                detail = f'{e["hours"]:g}h' if e['hours'] is not None else repr(e['value'])
+                self.stdout.write(f'{e["week_start"]}  {e["employee"]:<30} {e["label"]:<26} {e["day"]:<5} {detail}')
+        counts = exceptions['rule'].value_counts()
+        summary = ', '.join(f'{counts.get(rule, 0)} {rule}' for rule in analytics.RULES)
+        self.stderr.write(self.style.SUCCESS(f'{len(exceptions)} exceptions for weeks {date_from} to {date_to} ({summary}) in {elapsed:.3f}s'))
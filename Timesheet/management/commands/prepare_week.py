@@ -0,0 +1,38 @@
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from Timesheet.cloning import clone_latest_timesheets
+
+
+class Command(BaseCommand):
+    help = "Prepare a week by cloning each foreman's latest timesheet into it"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--week', help='Monday of the week to prepare (YYYY-MM-DD). Defaults to this week.')
+        parser.add_argument('--owners', nargs='*', help='Usernames to prepare. Defaults to all active users in the User group.')
+        parser.add_argument('--include-hours', action='store_true', help='Copy hours as well as employees and jobsites')
+
+    def handle(self, *args, **options):
+        if options['week']:
+            try:
+                week_start = datetime.strptime(options['week'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--week must be a date in YYYY-MM-DD format')
+            if week_start.weekday() != 0:
+                raise CommandError('--week must be a Monday')
+        else:
+            today = date.today()
+            week_start = today - timedelta(days=today.weekday())
+
+        owners = User.objects.filter(is_active=True)
+        if options['owners']:
+            owners = owners.filter(username__in=options['owners'])
+        else:
+            owners = owners.filter(groups__name='User')
+        owner_ids = list(owners.values_list('pk', flat=True))
+
+        created = clone_latest_timesheets(owner_ids, week_start, include_hours=options['include_hours'])
+        skipped = len(owner_ids) - len(created)
+        self.stdout.write(self.style.SUCCESS(f'Prepared {len(created)} timesheets for {week_start} ({skipped} skipped)'))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Timesheet import provisioning
+
+
+class Command(BaseCommand):
+    help = 'Create users, crew members and manager assignments from a bulk upload CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help=f'CSV with the header {",".join(provisioning.COLUMNS)}')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating anything')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], encoding='utf-8-sig', newline='') as f:
+                text = f.read()
+        except OSError as exc:
+            raise CommandError(f'Cannot read {options["csv_file"]}: {exc}')
+        except UnicodeDecodeError:
+            raise CommandError('The file must be UTF-8 encoded CSV')
+
+        try:
+            plan = provisioning.parse(text)
+        except provisioning.ProvisioningError as exc:
+            for error in exc.errors:
+                self.stderr.write(error)
+            raise CommandError(f'{len(exc.errors)} problem(s) found; nothing was created')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'File is valid: {len(plan["users"])} users and {len(plan["employees"])} crew lines'
+            ))
+            return
+
+        started = time.perf_counter()
+        users, employees, assignments = provisioning.apply(plan)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {users} users and {employees} crew members; {assignments} manager assignments processed '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
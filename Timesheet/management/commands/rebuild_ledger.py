@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from Timesheet import ledger
+
+
+class Command(BaseCommand):
+    help = 'Recompute the employee weekly hours ledger from all timesheet rows'
+
+    def handle(self, *args, **options):
+        count = ledger.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Ledger rebuilt ({count} employee weeks)'))
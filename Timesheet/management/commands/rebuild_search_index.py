@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from Timesheet.models import Timesheet
+from Timesheet.search import ensure_search_index, index_timesheets
+
+
+class Command(BaseCommand):
+    help = 'Create the full-text search structures if missing and re-index every timesheet'
+
+    def handle(self, *args, **options):
+        ensure_search_index()
+        ids = list(Timesheet.objects.values_list('pk', flat=True))
+        for start in range(0, len(ids), 1000):
+            index_timesheets(ids[start:start + 1000])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {len(ids)} timesheets'))
@@ -0,0 +1,39 @@
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from Timesheet.digest import send_weekly_digest
+
+
+class Command(BaseCommand):
+    help = 'Email the weekly timesheet digest to foremen and Accounting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--week', help='Monday of the week to summarize (YYYY-MM-DD). Defaults to last week.')
+        parser.add_argument('--users', nargs='*', help='Only send to these usernames')
+        parser.add_argument('--batch-size', type=int, default=200, help='Messages rendered and sent per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Collect and render the messages without sending them')
+
+    def handle(self, *args, **options):
+        if options['week']:
+            try:
+                week_start = datetime.strptime(options['week'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--week must be a date in YYYY-MM-DD format')
+            if week_start.weekday() != 0:
+                raise CommandError('--week must be a Monday')
+        else:
+            # run on Monday morning: summarize the week that just ended
+            today = date.today()
+            week_start = today - timedelta(days=today.weekday(), weeks=1)
+
+        stats = send_weekly_digest(
+            week_start, usernames=options['users'], batch_size=max(1, options['batch_size']), dry_run=options['dry_run'],
+        )
+        action = 'Rendered' if options['dry_run'] else f'Sent {stats["sent"]} of'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {stats["recipients"]} digests for {week_start} via {settings.EMAIL_BACKEND.rsplit(".", 2)[-2]} '
+            f'in {stats["seconds"]:.2f}s ({stats["per_second"]:.0f}/s; '
+            f'collect {stats["collect_seconds"]:.2f}s, render {stats["render_seconds"]:.2f}s)'
+        ))
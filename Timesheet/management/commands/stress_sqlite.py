@@ -0,0 +1,84 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, transaction
+
+from Timesheet.models import Timesheet, TimesheetRow, DAY_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Stress the SQLite profile with concurrent timesheet writers and report lock errors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=16, help='Concurrent writer threads')
+        parser.add_argument('--sheets', type=int, default=25, help='Timesheets saved per writer')
+        parser.add_argument('--rows', type=int, default=10, help='Rows per timesheet')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('stress_sqlite only applies to the SQLite database')
+
+        # a file-backed throwaway database: the in-memory test default can't show locking
+        tmpdir = tempfile.mkdtemp()
+        connection.settings_dict['TEST'] = {**connection.settings_dict.get('TEST', {}), 'NAME': os.path.join(tmpdir, 'stress.sqlite3')}
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._run(options['writers'], options['sheets'], options['rows'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(tmpdir, ignore_errors=True)
+
+    def _run(self, writers, sheets, rows):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        owners = [User.objects.create_user(f'stress-{n}', password='unused') for n in range(writers)]
+        lock_errors = []
+        saved = []
+        # release this thread's connection so the writers start from a clean slate
+        connection.close()
+
+        def writer(owner):
+            from django.db import connection as thread_connection
+            monday = date(2025, 1, 6)
+            try:
+                for n in range(sheets):
+                    try:
+                        # same shape as the timesheet views: read, then save the sheet and
+                        # replace its rows in one transaction. The read-then-write upgrade is
+                        # what fails with "database is locked" under deferred transactions.
+                        with transaction.atomic():
+                            Timesheet.objects.filter(owner=owner, week_start=monday + timedelta(days=7 * n)).exists()
+                            ts = Timesheet.objects.create(owner=owner, week_start=monday + timedelta(days=7 * n))
+                            ts.rows.all().delete()
+                            TimesheetRow.objects.bulk_create([
+                                TimesheetRow(timesheet=ts, employee_name=f'Crew {r}', jobsite_num='1000', **{d: '8' for d in DAY_FIELDS[:5]})
+                                for r in range(rows)
+                            ])
+                        saved.append(ts.pk)
+                    except OperationalError as exc:
+                        lock_errors.append(str(exc))
+            finally:
+                thread_connection.close()
+
+        threads = [threading.Thread(target=writer, args=(owner,)) for owner in owners]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        attempted = writers * sheets
+        self.stdout.write(f'journal_mode={journal_mode} writers={writers} sheets/writer={sheets} rows/sheet={rows}')
+        self.stdout.write(f'saved {len(saved)}/{attempted} timesheets in {elapsed:.2f}s ({len(saved) / elapsed:.0f} sheets/s)')
+        if lock_errors:
+            self.stdout.write(self.style.ERROR(f'{len(lock_errors)} lock errors, e.g. {lock_errors[0]!r}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('0 lock errors'))
@@ -1,6 +1,16 @@
+import json
+import zlib
+
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.conf import settings
 
+from .utils import hours_error
+
+
+# TimesheetRow day columns in week order (Monday first)
+DAY_FIELDS = ['mon', 'tues', 'wed', 'thur', 'fri', 'sat', 'sun']
+
 
 class Employee(models.Model):
 	# Allow multiple managers for a single Employee. Keep related_name 'employees'
@@ -25,6 +35,12 @@ class Timesheet(models.Model):
 	data_json = models.JSONField(blank=True, null=True)
 	additional_notes = models.TextField(blank=True, default='')
 
+	class Meta:
+		indexes = [
+			# weekly lookups across owners (conflict report, copy-forward)
+			models.Index(fields=['week_start', 'owner']),
+		]
+
 	def __str__(self):
 		return f"Timesheet {self.pk} by {self.owner} for {self.week_start}"
 
@@ -43,9 +59,71 @@ class TimesheetRow(models.Model):
 	jobsite_name = models.CharField(max_length=255, blank=True)
 	jobsite_num = models.CharField(max_length=100, blank=True)
 
+	class Meta:
+		indexes = [
+			# (employee, timesheet) path used to find an employee's rows for a week
+			models.Index(fields=['employee', 'timesheet']),
+		]
 
+	def clean(self):
+		# the grid and the API check this too; this covers the admin inline
+		errors = {}
+		for field in DAY_FIELDS:
+			error = hours_error(getattr(self, field))
+			if error:
+				errors[field] = error.capitalize()
+		if errors:
+			raise ValidationError(errors)
 
 	def __str__(self):
 		return f"Row {self.pk} for Timesheet {self.timesheet_id} - {self.employee_name or (self.employee.name if self.employee else 'Unknown')}"
 
 
+class EmployeeWeekHours(models.Model):
+	"""Running hours ledger: one row per employee per week, kept current by Timesheet.ledger.
+
+	`ytd_hours` is the cumulative total for the calendar year of `week_start`
+	up to and including this week.
+	"""
+	employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='week_hours')
+	week_start = models.DateField()
+	# cells are capped at 24 hours, so one full timesheet adds at most 100 rows x 168 hours
+	# to a week; these leave room for hundreds of timesheets per employee per week
+	hours = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+	ytd_hours = models.DecimalField(max_digits=11, decimal_places=2, default=0)
+
+	class Meta:
+		constraints = [
+			models.UniqueConstraint(fields=['employee', 'week_start'], name='unique_employee_week_hours'),
+		]
+		ordering = ['employee', 'week_start']
+
+	def __str__(self):
+		return f"{self.employee.name} week of {self.week_start}: {self.hours}h (YTD {self.ytd_hours}h)"
+
+
+class ArchivedTimesheet(models.Model):
+	"""A closed timesheet moved out of Timesheet/TimesheetRow by `manage.py archive_timesheets`.
+
+	The rows are kept as zlib-compressed JSON so the hot tables stay small;
+	`original_id` is the Timesheet pk so old links keep resolving.
+	"""
+	original_id = models.BigIntegerField(unique=True)
+	owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_timesheets')
+	created_at = models.DateTimeField()
+	week_start = models.DateField(db_index=True)
+	additional_notes = models.TextField(blank=True, default='')
+	rows_data = models.BinaryField()
+	archived_at = models.DateTimeField(auto_now_add=True)
+
+	@staticmethod
+	def pack_rows(rows):
+		return zlib.compress(json.dumps(rows, separators=(',', ':')).encode('utf-8'))
+
+	@property
+	def rows(self):
+		"""The archived rows as a list of dicts with the TimesheetRow field names."""
+		return json.loads(zlib.decompress(bytes(self.rows_data)).decode('utf-8'))
+
+	def __str__(self):
+		return f"Archived timesheet {self.original_id} by {self.owner} for {self.week_start}"
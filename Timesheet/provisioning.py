@@ -0,0 +1,194 @@
+"""Bulk provisioning of users, crew members and manager assignments from CSV.
+
+The CSV has a header row with the columns:
+
+    type,name,email,password,groups,managers
+
+- ``user`` rows create a user: name is the username, groups a ``;``-separated
+  list of group names.
+- ``employee`` rows create a crew member, or add managers to an existing one
+  with the same name (like the add-to-crew flow); managers is a ``;``-separated
+  list of usernames, existing or created earlier in the same file.
+
+The whole file is validated in memory first (case-insensitive batch lookups
+against existing names), then applied in one transaction with bulk inserts.
+"""
+import csv
+import io
+import os
+
+import django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group, User
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .models import Employee
+
+
+COLUMNS = ['type', 'name', 'email', 'password', 'groups', 'managers']
+MAX_LINES = 5000
+# below this many passwords the process pool costs more than it saves
+POOL_THRESHOLD = 20
+
+
+class ProvisioningError(Exception):
+    def __init__(self, errors):
+        super().__init__('; '.join(errors))
+        self.errors = errors
+
+
+def _split(value):
+    return [part.strip() for part in (value or '').split(';') if part.strip()]
+
+
+def _field_errors(validator, value, max_length, label):
+    # bulk_create skips model validation, so check what the columns would enforce
+    if len(value) > max_length:
+        return [f'{label} must be at most {max_length} characters']
+    try:
+        validator(value)
+    except ValidationError as exc:
+        return exc.messages
+    return []
+
+
+def parse(text):
+    """Validate CSV text and return a plan for apply(); raise ProvisioningError listing every problem."""
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or [f.strip().lower() for f in reader.fieldnames] != COLUMNS:
+        raise ProvisioningError([f'Header must be: {",".join(COLUMNS)}'])
+    lines = [(n, {k.strip().lower(): (v or '').strip() for k, v in row.items() if k}) for n, row in enumerate(reader, start=2)]
+    if len(lines) > MAX_LINES:
+        raise ProvisioningError([f'At most {MAX_LINES} lines per file'])
+
+    user_lines = [(n, row) for n, row in lines if row['type'].lower() == 'user']
+    employee_lines = [(n, row) for n, row in lines if row['type'].lower() == 'employee']
+    errors = [f'Line {n}: type must be "user" or "employee"' for n, row in lines if row['type'].lower() not in ('user', 'employee')]
+
+    # one case-insensitive lookup per kind of name referenced anywhere in the file
+    new_usernames = {row['name'].lower() for n, row in user_lines}
+    manager_names = {m.lower() for n, row in employee_lines for m in _split(row['managers'])}
+    existing_users = {
+        u.lname: u.pk
+        for u in User.objects.annotate(lname=Lower('username')).filter(lname__in=new_usernames | manager_names)
+    }
+    existing_employees = {
+        e.lname: e.pk
+        for e in Employee.objects.annotate(lname=Lower('name')).filter(lname__in={row['name'].lower() for n, row in employee_lines})
+    }
+    group_names = {g.lower() for n, row in user_lines for g in _split(row['groups'])}
+    groups = {g.lname: g.pk for g in Group.objects.annotate(lname=Lower('name')).filter(lname__in=group_names)}
+
+    username_max_length = User._meta.get_field('username').max_length
+    email_max_length = User._meta.get_field('email').max_length
+    users, seen = [], set()
+    for n, row in user_lines:
+        key = row['name'].lower()
+        username_errors = _field_errors(User.username_validator, row['name'], username_max_length, 'username')
+        if not row['name']:
+            errors.append(f'Line {n}: username is required')
+        elif username_errors:
+            errors.extend(f'Line {n}: {e}' for e in username_errors)
+        elif key in existing_users:
+            errors.append(f'Line {n}: user {row["name"]} already exists')
+        elif key in seen:
+            errors.append(f'Line {n}: user {row["name"]} appears more than once')
+        if row['email']:
+            errors.extend(
+                f'Line {n}: {e}'
+                for e in _field_errors(validate_email, row['email'], email_max_length, 'email')
+            )
+        if not row['password']:
+            errors.append(f'Line {n}: password is required')
+        unknown = [g for g in _split(row['groups']) if g.lower() not in groups]
+        if unknown:
+            errors.append(f'Line {n}: unknown group(s) {", ".join(unknown)}')
+        seen.add(key)
+        users.append({
+            'username': row['name'],
+            'email': row['email'],
+            'password': row['password'],
+            'group_ids': [groups[g.lower()] for g in _split(row['groups']) if g.lower() in groups],
+        })
+
+    name_max_length = Employee._meta.get_field('name').max_length
+    employees, seen = [], set()
+    for n, row in employee_lines:
+        key = row['name'].lower()
+        if not row['name']:
+            errors.append(f'Line {n}: employee name is required')
+        elif len(row['name']) > name_max_length:
+            errors.append(f'Line {n}: employee name must be at most {name_max_length} characters')
+        elif key in seen:
+            errors.append(f'Line {n}: employee {row["name"]} appears more than once')
+        unknown = [m for m in _split(row['managers']) if m.lower() not in existing_users and m.lower() not in new_usernames]
+        if unknown:
+            errors.append(f'Line {n}: unknown manager(s) {", ".join(unknown)}')
+        seen.add(key)
+        employees.append({
+            'name': row['name'],
+            'existing_id': existing_employees.get(key),
+            'managers': [m.lower() for m in _split(row['managers'])],
+        })
+
+    if errors:
+        raise ProvisioningError(errors)
+    return {'users': users, 'employees': employees, 'existing_users': existing_users}
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def hash_passwords(passwords, parallel=True):
+    """Hash passwords with the configured hasher, spread over a process pool for large batches.
+
+    Web requests pass parallel=False: forking a pool from a server worker is
+    unsafe, so the upload form caps the batch size instead.
+    """
+    if not parallel or len(passwords) < POOL_THRESHOLD:
+        return [make_password(p) for p in passwords]
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = min(os.cpu_count() or 1, 8)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'Intranet_Project.settings'),)) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+def apply(plan, parallel=True):
+    """Create everything in plan in one transaction. Returns (users, employees, assignments) counts."""
+    hashed = hash_passwords([u['password'] for u in plan['users']], parallel=parallel)
+
+    with transaction.atomic():
+        new_users = User.objects.bulk_create([
+            User(username=u['username'], email=u['email'], password=password)
+            for u, password in zip(plan['users'], hashed)
+        ])
+        UserGroups = User.groups.through
+        UserGroups.objects.bulk_create([
+            UserGroups(user_id=user.pk, group_id=group_id)
+            for user, u in zip(new_users, plan['users'])
+            for group_id in u['group_ids']
+        ])
+        user_ids = dict(plan['existing_users'])
+        user_ids.update({user.username.lower(): user.pk for user in new_users})
+
+        to_create = [e for e in plan['employees'] if e['existing_id'] is None]
+        created = Employee.objects.bulk_create([Employee(name=e['name']) for e in to_create])
+        for e, emp in zip(to_create, created):
+            e['existing_id'] = emp.pk
+
+        # existing assignments are left alone
+        Managers = Employee.managers.through
+        assignments = Managers.objects.bulk_create([
+            Managers(employee_id=e['existing_id'], user_id=user_ids[m])
+            for e in plan['employees']
+            for m in e['managers']
+        ], ignore_conflicts=True)
+
+    return len(new_users), len(created), len(assignments)
@@ -0,0 +1,17 @@
+"""Group-based role checks.
+
+Kept free of heavy imports so the context processor and other modules that
+only need a role check don't pull in the views.
+"""
+
+
+def is_admin_or_accounting(user):
+    return user.groups.filter(name__in=['Admin', 'Accounting']).exists()
+
+
+def is_admin(user):
+    return user.groups.filter(name='Admin').exists()
+
+
+def is_user_group(user):
+    return user.groups.filter(name='User').exists()
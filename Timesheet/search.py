@@ -0,0 +1,142 @@
+"""Free-text search over timesheet notes and jobsite names.
+
+PostgreSQL uses SearchVector queries backed by GIN expression indexes. SQLite uses
+an FTS5 shadow table (one document per timesheet, rowid = timesheet id) that is
+refreshed after a timesheet or its rows are saved. Both structures are created
+after migrate by ensure_search_index(); other backends fall back to icontains.
+"""
+import threading
+
+from django.db import OperationalError, connection, transaction
+from django.db.models import Exists, OuterRef, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Timesheet, TimesheetRow
+
+
+FTS_TABLE = 'timesheet_search_fts'
+SEARCH_CONFIG = 'english'
+POSTGRES_INDEXES = [
+    (TimesheetRow, 'jobsite_name', 'ts_row_jobsite_search'),
+    (Timesheet, 'additional_notes', 'ts_notes_search'),
+]
+
+_pending = threading.local()
+
+
+def _fts_available():
+    with connection.cursor() as cursor:
+        return FTS_TABLE in connection.introspection.table_names(cursor)
+
+
+def ensure_search_index(**kwargs):
+    """Create the backend's search structures if missing (post_migrate receiver)."""
+    with connection.cursor() as cursor:
+        existing_tables = connection.introspection.table_names(cursor)
+    if not all(model._meta.db_table in existing_tables for model in (Timesheet, TimesheetRow)):
+        # the app's own tables haven't been created yet (makemigrations not run)
+        return
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+        with connection.schema_editor() as editor:
+            for model, field, name in POSTGRES_INDEXES:
+                with connection.cursor() as cursor:
+                    existing = connection.introspection.get_constraints(cursor, model._meta.db_table)
+                if name not in existing:
+                    # built from the same SearchVector used in queries so the planner can use it
+                    editor.add_index(model, GinIndex(SearchVector(field, config=SEARCH_CONFIG), name=name))
+    elif connection.vendor == 'sqlite':
+        if _fts_available():
+            return
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(notes, jobsites)')
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to icontains
+            return
+        index_timesheets(Timesheet.objects.values_list('pk', flat=True))
+
+
+def index_timesheets(ts_ids):
+    """Refresh the SQLite FTS documents for the given timesheet ids."""
+    ts_ids = list(ts_ids)
+    if connection.vendor != 'sqlite' or not ts_ids or not _fts_available():
+        return
+    jobsites = {}
+    for ts_id, name in TimesheetRow.objects.filter(timesheet_id__in=ts_ids).exclude(jobsite_name='').values_list('timesheet_id', 'jobsite_name'):
+        jobsites.setdefault(ts_id, []).append(name)
+    notes = dict(Timesheet.objects.filter(pk__in=ts_ids).values_list('pk', 'additional_notes'))
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(ts_ids), 500):
+            batch = ts_ids[start:start + 500]
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({", ".join(["%s"] * len(batch))})', batch)
+        # deleted timesheets have no notes entry and simply drop out of the index
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, notes, jobsites) VALUES (%s, %s, %s)',
+            [(pk, text, ' '.join(jobsites.get(pk, []))) for pk, text in notes.items()],
+        )
+
+
+def _flush_pending():
+    ts_ids = getattr(_pending, 'ids', set())
+    _pending.ids = set()
+    index_timesheets(ts_ids)
+
+
+def schedule_index(ts_ids):
+    """Re-index timesheets once the current transaction commits."""
+    if connection.vendor != 'sqlite':
+        return
+    if not hasattr(_pending, 'ids'):
+        _pending.ids = set()
+    _pending.ids.update(ts_ids)
+    transaction.on_commit(_flush_pending)
+
+
+def _fts_query(text):
+    # quote every word so user input can't inject FTS5 syntax; prefix-match each one
+    words = [w.replace('"', '""') for w in text.split()]
+    return ' '.join(f'"{w}"*' for w in words)
+
+
+def text_filter(q):
+    """Return a Q over Timesheet matching q in additional_notes or any row's jobsite_name."""
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+        query = SearchQuery(q, config=SEARCH_CONFIG, search_type='websearch')
+        matching_rows = TimesheetRow.objects.annotate(
+            search=SearchVector('jobsite_name', config=SEARCH_CONFIG)
+        ).filter(timesheet=OuterRef('pk'), search=query)
+        matching_notes = Timesheet.objects.annotate(
+            search=SearchVector('additional_notes', config=SEARCH_CONFIG)
+        ).filter(search=query).values('pk')
+        return Q(pk__in=matching_notes) | Q(Exists(matching_rows))
+    if connection.vendor == 'sqlite' and _fts_available():
+        return Q(pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts_query(q)]))
+    matching_rows = TimesheetRow.objects.filter(timesheet=OuterRef('pk'), jobsite_name__icontains=q)
+    return Q(additional_notes__icontains=q) | Q(Exists(matching_rows))
+
+
+def search_timesheets(queryset, owner=None, date_from=None, date_to=None, employee=None, jobsite_num=None, q=None):
+    """Filter a Timesheet queryset for the archive search.
+
+    Row-level criteria (employee, jobsite number, jobsite text) are EXISTS
+    subqueries, so rows are never joined or loaded for sheets that don't match.
+    """
+    if owner:
+        queryset = queryset.filter(owner__username__iexact=owner)
+    if date_from:
+        queryset = queryset.filter(week_start__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(week_start__lte=date_to)
+    if employee:
+        queryset = queryset.filter(Exists(TimesheetRow.objects.filter(
+            Q(employee_name__icontains=employee) | Q(employee__name__icontains=employee), timesheet=OuterRef('pk')
+        )))
+    if jobsite_num:
+        queryset = queryset.filter(Exists(TimesheetRow.objects.filter(timesheet=OuterRef('pk'), jobsite_num=jobsite_num)))
+    if q and q.strip():
+        queryset = queryset.filter(text_filter(q.strip()))
+    return queryset
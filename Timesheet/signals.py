@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.auth.signals import user_login_failed
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import ledger, search
+from .models import ArchivedTimesheet, Timesheet, TimesheetRow
+from .utils import axes_uses_cache, remember_failed_login
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """Apply settings.TIMESHEET_SQLITE_PRAGMAS to every new SQLite connection."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'TIMESHEET_SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(user_login_failed)
+def record_failed_login(sender, credentials, request=None, **kwargs):
+    """Under the axes cache handler, remember which IPs each username failed from."""
+    if request is not None and axes_uses_cache():
+        remember_failed_login(request, credentials)
+
+
+@receiver(post_save, sender=Timesheet)
+@receiver(post_delete, sender=Timesheet)
+def reindex_timesheet(sender, instance, **kwargs):
+    """Keep the SQLite full-text shadow table in step with saved/deleted timesheets."""
+    search.schedule_index([instance.pk])
+
+
+@receiver(pre_save, sender=TimesheetRow)
+@receiver(pre_delete, sender=TimesheetRow)
+def remember_row_hours(sender, instance, raw=False, **kwargs):
+    """Note a row's ledger hours before an untracked change (admin inline, cascades)."""
+    if raw or ledger.is_suspended():
+        return
+    instance._ledger_before = ledger.row_hours(TimesheetRow.objects.filter(pk=instance.pk)) if instance.pk else {}
+
+
+@receiver(post_save, sender=TimesheetRow)
+@receiver(post_delete, sender=TimesheetRow)
+def update_ledger_for_row(sender, instance, raw=False, **kwargs):
+    if not hasattr(instance, '_ledger_before'):
+        return
+    before = instance.__dict__.pop('_ledger_before')
+    after = {} if kwargs['signal'] is post_delete else ledger.row_hours(TimesheetRow.objects.filter(pk=instance.pk))
+    ledger.apply_difference(before, after)
+
+
+@receiver(pre_save, sender=Timesheet)
+def remember_timesheet_week(sender, instance, raw=False, **kwargs):
+    """Note a timesheet's ledger hours when an edit (e.g. in the admin) moves it to another week."""
+    if raw or ledger.is_suspended() or not instance.pk:
+        return
+    old_week = Timesheet.objects.filter(pk=instance.pk).values_list('week_start', flat=True).first()
+    if old_week is not None and old_week != instance.week_start:
+        instance._ledger_before = ledger.timesheet_hours([instance.pk])
+
+
+@receiver(post_save, sender=Timesheet)
+def move_timesheet_hours(sender, instance, **kwargs):
+    if hasattr(instance, '_ledger_before'):
+        ledger.apply_difference(instance.__dict__.pop('_ledger_before'), ledger.timesheet_hours([instance.pk]))
+
+
+@receiver(post_delete, sender=ArchivedTimesheet)
+def remove_archived_hours(sender, instance, **kwargs):
+    """Archived hours count towards the ledger until the archived timesheet itself is deleted."""
+    if not ledger.is_suspended():
+        ledger.apply_difference(ledger.archived_hours(instance), {})
@@ -0,0 +1,53 @@
+// Client-side timesheet grid shared by the new/edit timesheet pages.
+//
+// Rows are built from the <template id="ts-row-template"> element instead of being
+// rendered server-side. On submit every non-empty row is serialized into the hidden
+// rows_json input as [employee, mon..sun, jobsite_name, jobsite_num], so the grid
+// posts one compact field instead of ten per row.
+(function () {
+  const form = document.getElementById('tsform');
+  const tbody = document.getElementById('ts-table-body');
+  const template = document.getElementById('ts-row-template');
+  const addBtn = document.getElementById('addRowBtn');
+  const rowsInput = document.getElementById('rows_json');
+  const maxRows = parseInt(form.dataset.maxRows, 10) || 100;
+  const initialRows = JSON.parse(document.getElementById('initial-rows').textContent);
+  const blankRows = 10;
+
+  function cells(tr) {
+    return [tr.querySelector('.ts-employee')].concat(Array.from(tr.querySelectorAll('.ts-cell')));
+  }
+
+  function updateAddButton() {
+    if (addBtn) { addBtn.disabled = tbody.rows.length >= maxRows; }
+  }
+
+  function addRow(values) {
+    if (tbody.rows.length >= maxRows) { return; }
+    const tr = template.content.firstElementChild.cloneNode(true);
+    if (values) {
+      cells(tr).forEach((el, i) => { el.value = values[i] || ''; });
+    }
+    tbody.appendChild(tr);
+    updateAddButton();
+  }
+
+  initialRows.forEach(addRow);
+  for (let i = initialRows.length; i < blankRows; i++) { addRow(); }
+
+  if (addBtn) { addBtn.addEventListener('click', () => addRow()); }
+
+  form.addEventListener('submit', () => {
+    // keep the hidden week_start in sync with the visible date picker (new timesheet page)
+    const visible = document.getElementById('week_start_input');
+    const hidden = document.querySelector('input[name="week_start"][type="hidden"]');
+    if (visible && hidden) { hidden.value = visible.value; }
+
+    const rows = [];
+    Array.from(tbody.rows).forEach((tr) => {
+      const values = cells(tr).map((el) => el.value.trim());
+      if (values.some((v) => v)) { rows.push(values); }
+    });
+    rowsInput.value = JSON.stringify(rows);
+  });
+})();
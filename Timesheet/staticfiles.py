@@ -0,0 +1,141 @@
+"""Production static files: hashed, pre-compressed files served with far-future caching.
+
+CompressedManifestStaticFilesStorage hashes file names like Django's
+ManifestStaticFilesStorage and, during collectstatic, also writes ``.gz`` (and
+``.br`` when the optional ``brotli`` package is installed) copies of text
+assets next to each file.
+
+StaticFilesMiddleware serves STATIC_ROOT from the Django process for
+deployments without a front-end web server. It indexes STATIC_ROOT once at
+startup, picks the smallest encoding the client accepts, and marks hashed
+files immutable for a year so a browser downloads each asset once per release.
+Requests it doesn't serve fall through to the rest of the stack.
+"""
+import gzip
+import json
+import mimetypes
+import os
+import re
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.xml', '.ico'}
+# a compressed copy is only kept when it saves at least this fraction of the size
+MIN_SAVING = 0.05
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# files without a content hash in their name may change on the next deploy
+DEFAULT_MAX_AGE = 60
+# (Content-Encoding, file suffix) in order of preference
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+
+def compress_file(path):
+    """Write .gz (and .br if available) copies of path; return the suffixes written."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    written = []
+    for suffix, compressed in (('.gz', lambda: gzip.compress(data, compresslevel=9, mtime=0)),
+                               ('.br', lambda: brotli.compress(data) if brotli else None)):
+        output = compressed()
+        if output is None or len(output) > len(data) * (1 - MIN_SAVING):
+            continue
+        with open(path + suffix, 'wb') as f:
+            f.write(output)
+        written.append(suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        # compress both the original and the hashed names; templates only use
+        # the hashed ones but anything linking a plain path still benefits
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS and self.exists(name):
+                for suffix in compress_file(self.path(name)):
+                    yield name, name + suffix, True
+
+
+def _accepted_encodings(header):
+    return {encoding for encoding, _ in ENCODINGS if re.search(rf'\b{encoding}\b', header)}
+
+
+class StaticFilesMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = urlsplit(settings.STATIC_URL).path
+        self.files = self._index(settings.STATIC_ROOT) if settings.STATIC_ROOT else {}
+
+    def _index(self, root):
+        # url path -> (file path, mtime, headers, {encoding: compressed path})
+        if not os.path.isdir(root):
+            return {}
+        try:
+            with open(os.path.join(root, 'staticfiles.json')) as f:
+                hashed = set(json.load(f).get('paths', {}).values())
+        except (OSError, ValueError):
+            hashed = set()
+
+        found = {}
+        for directory, _, filenames in os.walk(root):
+            existing = set(filenames)
+            for filename in filenames:
+                if filename.endswith(('.gz', '.br')) and filename[:-3] in existing:
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                stat = os.stat(path)
+                content_type = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+                if content_type.startswith('text/') or content_type == 'application/javascript':
+                    content_type += '; charset=utf-8'
+                max_age = IMMUTABLE_MAX_AGE if name in hashed else DEFAULT_MAX_AGE
+                headers = {
+                    'Content-Type': content_type,
+                    'Cache-Control': f'public, max-age={max_age}' + (', immutable' if name in hashed else ''),
+                    'Last-Modified': http_date(stat.st_mtime),
+                    # weak: the same tag covers the identity and compressed encodings
+                    'ETag': f'W/"{stat.st_size:x}-{int(stat.st_mtime):x}"',
+                }
+                variants = {
+                    encoding: path + suffix
+                    for encoding, suffix in ENCODINGS
+                    if filename + suffix in existing
+                }
+                if variants:
+                    headers['Vary'] = 'Accept-Encoding'
+                found[self.prefix + name] = (path, int(stat.st_mtime), headers, variants)
+        return found
+
+    def __call__(self, request):
+        entry = self.files.get(request.path_info) if request.method in ('GET', 'HEAD') else None
+        if entry is None:
+            return self.get_response(request)
+        path, mtime, headers, variants = entry
+
+        response = get_conditional_response(request, etag=headers['ETag'], last_modified=mtime)
+        if response is None:
+            accepted = _accepted_encodings(request.headers.get('Accept-Encoding', ''))
+            encoding = next((e for e, _ in ENCODINGS if e in variants and e in accepted), None)
+            response = FileResponse(open(variants.get(encoding, path), 'rb'), content_type=headers['Content-Type'])
+            # FileResponse names the file it opened, which may be the .gz/.br copy
+            response.headers.pop('Content-Disposition', None)
+            if encoding:
+                response['Content-Encoding'] = encoding
+        for header, value in headers.items():
+            if header != 'Content-Type' or response.status_code == 200:
+                response[header] = value
+        return response
@@ -1,3 +1,247 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+import pandas as pd
+from axes.handlers.proxy import AxesProxyHandler
+from django.contrib.auth.models import Group, User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import analytics, ledger
+from .forms import BulkProvisionForm
+from .utils import is_user_locked, parse_hours, unlock_user_attempts
+from .archive import archive_timesheets
+from .cloning import clone_latest_timesheet
+from .models import DAY_FIELDS, ArchivedTimesheet, Employee, EmployeeWeekHours, Timesheet, TimesheetRow
+
+
+# fixed past Mondays for tests that don't go through the (date-limited) edit views
+WEEK = date(2025, 3, 10)
+PREVIOUS_WEEK = date(2025, 3, 3)
+
+
+def grid_row(employee, hours, jobsite=''):
+    """One rows_json entry: employee, the seven day cells, jobsite name and number."""
+    return [str(employee.pk)] + list(hours) + [''] * (7 - len(hours)) + [jobsite, '']
+
+
+class LedgerTests(TestCase):
+    """The incrementally maintained ledger must always equal a full rebuild."""
+
+    def setUp(self):
+        self.foreman = User.objects.create_user('foreman', password='unused')
+        self.foreman.groups.add(Group.objects.get_or_create(name='User')[0])
+        self.admin = User.objects.create_user('admin', password='unused')
+        self.admin.groups.add(Group.objects.get_or_create(name='Admin')[0])
+        self.alice = Employee.objects.create(name='Alice')
+        self.bob = Employee.objects.create(name='Bob')
+        for emp in (self.alice, self.bob):
+            emp.managers.add(self.foreman)
+        today = date.today()
+        self.week = today - timedelta(days=today.weekday())
+        self.client.force_login(self.foreman)
+
+    def assertLedgerMatchesRebuild(self):
+        def snapshot():
+            return set(EmployeeWeekHours.objects.values_list('employee_id', 'week_start', 'hours', 'ytd_hours'))
+
+        incremental = snapshot()
+        ledger.rebuild()
+        self.assertEqual(incremental, snapshot())
+
+    def ledger_hours(self, employee, week):
+        return EmployeeWeekHours.objects.filter(employee=employee, week_start=week).values_list('hours', 'ytd_hours').first()
+
+    def make_sheet(self, owner, week, rows):
+        with ledger.tracking([]) as tracked:
+            ts = Timesheet.objects.create(owner=owner, week_start=week)
+            tracked.append(ts.pk)
+            TimesheetRow.objects.bulk_create([TimesheetRow(timesheet=ts, employee=emp, **hours) for emp, hours in rows])
+        return ts
+
+    def test_create_and_edit_through_views(self):
+        response = self.client.post(reverse('Timesheet:new_timesheet'), {
+            'week_start': self.week.isoformat(),
+            'rows_json': json.dumps([grid_row(self.alice, ['8', '8', 'Vaca']), grid_row(self.bob, ['10'])]),
+        }, secure=True)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.ledger_hours(self.alice, self.week)[0], Decimal('16'))
+        self.assertLedgerMatchesRebuild()
+
+        ts = Timesheet.objects.get(owner=self.foreman, week_start=self.week)
+        self.client.post(reverse('Timesheet:edit_timesheet', args=[ts.pk]), {
+            'rows_json': json.dumps([grid_row(self.alice, ['4'])]),
+            'additional_notes': '',
+        }, secure=True)
+        self.assertEqual(self.ledger_hours(self.alice, self.week)[0], Decimal('4'))
+        self.assertIsNone(self.ledger_hours(self.bob, self.week))
+        self.assertLedgerMatchesRebuild()
+
+    def test_earlier_week_updates_later_ytd(self):
+        later = self.make_sheet(self.admin, WEEK, [(self.alice, {'mon': '8'})])
+        earlier = self.make_sheet(self.admin, PREVIOUS_WEEK, [(self.alice, {'mon': '5', 'tues': '5'})])
+        self.assertEqual(self.ledger_hours(self.alice, WEEK), (Decimal('8'), Decimal('18')))
+        self.assertLedgerMatchesRebuild()
+        with ledger.tracking([earlier.pk]):
+            earlier.rows.all().delete()
+        self.assertLedgerMatchesRebuild()
+        later.delete()
+        self.assertLedgerMatchesRebuild()
+
+    def test_untracked_row_changes(self):
+        # what the admin's TimesheetRow inline does: plain saves and deletes outside tracking()
+        ts = self.make_sheet(self.admin, WEEK, [(self.alice, {'mon': '8'})])
+        row = TimesheetRow.objects.create(timesheet=ts, employee=self.bob, wed='6')
+        self.assertLedgerMatchesRebuild()
+        row.employee = self.alice
+        row.wed = '7.5'
+        row.save()
+        self.assertEqual(self.ledger_hours(self.alice, WEEK)[0], Decimal('15.5'))
+        self.assertLedgerMatchesRebuild()
+        row.delete()
+        self.assertLedgerMatchesRebuild()
+
+        ts.week_start = PREVIOUS_WEEK
+        ts.save()
+        self.assertIsNone(self.ledger_hours(self.alice, WEEK))
+        self.assertLedgerMatchesRebuild()
+
+    def test_deleting_timesheet_and_owner(self):
+        ts = self.make_sheet(self.admin, WEEK, [(self.alice, {'mon': '8'}), (self.bob, {'fri': '9'})])
+        self.make_sheet(self.foreman, WEEK, [(self.alice, {'tues': '3'})])
+        ts.delete()
+        self.assertEqual(self.ledger_hours(self.alice, WEEK)[0], Decimal('3'))
+        self.assertLedgerMatchesRebuild()
+        self.foreman.delete()
+        self.assertFalse(EmployeeWeekHours.objects.exists())
+        self.assertLedgerMatchesRebuild()
+
+    def test_clone_with_hours(self):
+        self.make_sheet(self.foreman, PREVIOUS_WEEK, [(self.alice, {'mon': '8'})])
+        self.assertIsNotNone(clone_latest_timesheet(self.foreman, WEEK, include_hours=True))
+        self.assertEqual(self.ledger_hours(self.alice, WEEK), (Decimal('8'), Decimal('16')))
+        self.assertLedgerMatchesRebuild()
+
+    def test_archived_hours_stay_until_the_archive_is_deleted(self):
+        self.make_sheet(self.admin, PREVIOUS_WEEK, [(self.alice, {'mon': '8'})])
+        self.make_sheet(self.admin, WEEK, [(self.alice, {'mon': '2'})])
+        self.assertEqual(archive_timesheets(WEEK), 1)
+        self.assertEqual(self.ledger_hours(self.alice, WEEK), (Decimal('2'), Decimal('10')))
+        self.assertLedgerMatchesRebuild()
+        ArchivedTimesheet.objects.get().delete()
+        self.assertIsNone(self.ledger_hours(self.alice, PREVIOUS_WEEK))
+        self.assertEqual(self.ledger_hours(self.alice, WEEK), (Decimal('2'), Decimal('2')))
+        self.assertLedgerMatchesRebuild()
+
+    def test_impossible_hours_are_rejected(self):
+        response = self.client.post(reverse('Timesheet:new_timesheet'), {
+            'week_start': self.week.isoformat(),
+            'rows_json': json.dumps([grid_row(self.alice, ['1e30'])]),
+        }, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Timesheet.objects.exists())
+        # rows stored before the check are left out of the ledger rather than breaking it
+        self.make_sheet(self.admin, WEEK, [(self.alice, {'mon': '123456', 'tues': '8'})])
+        self.assertEqual(self.ledger_hours(self.alice, WEEK)[0], Decimal('8'))
+        self.assertLedgerMatchesRebuild()
+
+
+class ArchiveListTests(TestCase):
+    """Archived timesheets stay reachable from the archive listing."""
+
+    def test_listing_shows_own_archived_sheets(self):
+        foreman = User.objects.create_user('foreman', password='unused')
+        other = User.objects.create_user('other', password='unused')
+        alice = Employee.objects.create(name='Alice')
+        for owner in (foreman, other):
+            ts = Timesheet.objects.create(owner=owner, week_start=WEEK)
+            TimesheetRow.objects.create(timesheet=ts, employee=alice, employee_name='Alice', mon='8', jobsite_name='Depot')
+        self.assertEqual(archive_timesheets(PREVIOUS_WEEK + timedelta(weeks=2)), 2)
+        own = ArchivedTimesheet.objects.get(owner=foreman)
+
+        self.client.force_login(foreman)
+        response = self.client.get(reverse('Timesheet:archived_timesheets'), secure=True)
+        self.assertEqual([ts.original_id for ts in response.context['page']], [own.original_id])
+        self.assertContains(response, reverse('Timesheet:view_timesheet', args=[own.original_id]))
+        self.assertContains(response, 'Depot')
+        self.assertEqual(self.client.get(reverse('Timesheet:view_timesheet', args=[own.original_id]), secure=True).status_code, 200)
+
+
+@override_settings(TIMESHEET_BULK_UPLOAD_MAX_USERS=2, PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BulkProvisionTests(TestCase):
+    """Web uploads are capped; larger files go through the provision_users command."""
+
+    def csv_text(self, users):
+        lines = ['type,name,email,password,groups,managers']
+        lines += [f'user,user{n},,Initial-Pass-{n},,' for n in range(users)]
+        return '\n'.join(lines) + '\n'
+
+    def test_upload_over_the_limit_is_rejected(self):
+        upload = SimpleUploadedFile('users.csv', self.csv_text(3).encode())
+        form = BulkProvisionForm(files={'csv_file': upload})
+        self.assertFalse(form.is_valid())
+        self.assertIn('provision_users', form.errors['csv_file'][0])
+        upload = SimpleUploadedFile('users.csv', self.csv_text(2).encode())
+        self.assertTrue(BulkProvisionForm(files={'csv_file': upload}).is_valid())
+
+    def test_command_creates_users_beyond_the_limit(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(self.csv_text(3))
+        self.addCleanup(os.remove, f.name)
+        call_command('provision_users', f.name, '--dry-run', stdout=io.StringIO())
+        self.assertFalse(User.objects.exists())
+        call_command('provision_users', f.name, stdout=io.StringIO())
+        self.assertEqual(User.objects.count(), 3)
+        self.assertTrue(User.objects.get(username='user2').check_password('Initial-Pass-2'))
+
+
+@override_settings(
+    AXES_HANDLER='axes.handlers.cache.AxesCacheHandler',
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'lockout-tests'}},
+)
+class CacheLockoutTests(TestCase):
+    """Under the axes cache handler lockouts stay per IP, and User Management can still find and clear them."""
+
+    def setUp(self):
+        User.objects.create_user('foreman', password='right-password')
+        AxesProxyHandler.implementation = None
+        self.addCleanup(setattr, AxesProxyHandler, 'implementation', None)
+
+    def login(self, password, ip):
+        return self.client.post(reverse('Timesheet:login'), {'username': 'foreman', 'password': password}, REMOTE_ADDR=ip, secure=True)
+
+    def test_failures_lock_the_ip_not_the_account(self):
+        with self.assertLogs('axes', 'WARNING'):
+            for _ in range(5):
+                self.login('wrong', '10.0.0.1')
+            self.assertEqual(self.login('right-password', '10.0.0.1').status_code, 429)
+        self.assertTrue(is_user_locked('foreman'))
+        self.assertFalse(is_user_locked('someone-else'))
+        self.assertEqual(self.login('right-password', '10.0.0.2').status_code, 302)
+
+        self.client.logout()
+        self.assertGreater(unlock_user_attempts('foreman'), 0)
+        self.assertFalse(is_user_locked('foreman'))
+        self.assertEqual(self.login('right-password', '10.0.0.1').status_code, 302)
+
+
+class ParseHoursTests(SimpleTestCase):
+    """utils.parse_hours and the pandas exceptions report read cells the same way."""
+
+    CELLS = [
+        '8', ' 7.5 ', '+8', '-2', '.5', '8.', '1e1', '1e400', 'Vaca', '8h', '', '1,5',
+        '1_0', '\u0668', '\uff18', '\xa08', 'nan', 'inf', '-Infinity', '0x10',
+    ]
+
+    def test_matches_analytics(self):
+        frame = pd.DataFrame({day: self.CELLS if day == 'mon' else '' for day in DAY_FIELDS})
+        hours, _ = analytics.parse_frame(frame)
+        expected = [None if pd.isna(h) else h for h in hours['mon']]
+        self.assertEqual([parse_hours(cell) for cell in self.CELLS], expected)
+        self.assertIsNone(parse_hours('1_0'))
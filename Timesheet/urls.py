@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import views, api
 
 app_name = 'Timesheet'
 
@@ -9,14 +9,26 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('employees/add/', views.add_employee, name='add_employee'),
     path('crew/', views.crew_list, name='crew_list'),
+    path('employees/<int:pk>/', views.employee_detail, name='employee_detail'),
     path('employees/<int:pk>/delete/', views.delete_employee, name='delete_employee'),
     path('timesheet/new/', views.new_timesheet, name='new_timesheet'),
+    path('timesheet/copy-forward/', views.copy_forward_timesheet, name='copy_forward_timesheet'),
+    path('timesheet/search/', views.timesheet_search, name='timesheet_search'),
+    path('timesheet/archive/', views.archived_timesheets, name='archived_timesheets'),
     path('timesheet/<int:pk>/', views.view_timesheet, name='view_timesheet'),
     path('timesheet/<int:pk>/edit/', views.edit_timesheet, name='edit_timesheet'),
+    path('reports/conflicts/', views.conflicts_report, name='conflicts_report'),
+    path('reports/exceptions/', views.exceptions_report, name='exceptions_report'),
     path('users/', views.user_management, name='user_management'),
     path('users/create/', views.create_user, name='create_user'),
+    path('users/bulk/', views.bulk_provision, name='bulk_provision'),
     path('users/<int:pk>/edit/', views.edit_user, name='edit_user'),
     path('users/<int:pk>/reactivate/', views.reactivate_user, name='reactivate_user'),
     path('employees/<int:pk>/reactivate/', views.reactivate_employee, name='reactivate_employee'),
     path('users/<int:pk>/unlock/', views.unlock_user, name='unlock_user'),
+    path('api/v1/timesheets/', api.timesheet_list, name='api_timesheet_list'),
+    path('api/v1/timesheets/bulk/', api.timesheet_bulk, name='api_timesheet_bulk'),
+    path('api/v1/rows/', api.row_list, name='api_row_list'),
+    path('api/v1/archive/timesheets/', api.archived_timesheet_list, name='api_archived_timesheet_list'),
+    path('api/v1/employees/', api.employee_list, name='api_employee_list'),
 ]
@@ -1,6 +1,92 @@
-from axes.models import AccessAttempt
+import math
+import re
+
+from django.conf import settings
+
+
+def axes_uses_cache():
+    return settings.AXES_HANDLER == 'axes.handlers.cache.AxesCacheHandler'
+
+
+# most client IPs remembered per username for the cache handler
+MAX_FAILED_LOGIN_IPS = 20
+
+
+def _failed_login_ips_key(username):
+    return f'timesheet:failed-login-ips:{username}'
+
+
+def remember_failed_login(request, credentials):
+    """Note the client IP of a failed login for username (axes cache handler only).
+
+    The cache handler keeps counters per IP and nothing per username, so this
+    record is how User Management finds the IPs to show and clear for an account.
+    """
+    from axes.helpers import get_cache, get_cache_timeout, get_client_ip_address, get_client_username
+
+    username = get_client_username(request, credentials)
+    ip_address = get_client_ip_address(request)
+    if not username or not ip_address:
+        return
+    cache = get_cache()
+    key = _failed_login_ips_key(username)
+    ips = [ip for ip in cache.get(key, []) if ip != ip_address] + [ip_address]
+    cache.set(key, ips[-MAX_FAILED_LOGIN_IPS:], timeout=get_cache_timeout(request))
 
 
 def is_user_locked(username):
     """Check if a user account is locked due to too many failed login attempts."""
-    return AccessAttempt.objects.filter(username=username).exists()
\ No newline at end of file
+    if axes_uses_cache():
+        from axes.helpers import get_cache, make_cache_key_list
+        cache = get_cache()
+        ips = cache.get(_failed_login_ips_key(username), [])
+        keys = make_cache_key_list([{'ip_address': ip} for ip in ips])
+        return any(cache.get(key, 0) for key in keys)
+    from axes.models import AccessAttempt
+    return AccessAttempt.objects.filter(username=username).exists()
+
+
+def unlock_user_attempts(username):
+    """Clear failed login attempts for username from whichever axes handler is active."""
+    from axes.handlers.proxy import AxesProxyHandler
+    if axes_uses_cache():
+        from axes.helpers import get_cache
+        cache = get_cache()
+        key = _failed_login_ips_key(username)
+        count = sum(AxesProxyHandler.reset_attempts(ip_address=ip) for ip in cache.get(key, []))
+        cache.delete(key)
+        return count
+    return AxesProxyHandler.reset_attempts(username=username)
+
+
+# one timesheet cell is one person's hours for one day
+MAX_CELL_HOURS = 24
+
+# plain ASCII decimals, as pandas.to_numeric reads them: float() alone would also
+# take '1_0', non-ASCII digits and 'inf'/'nan'
+HOURS_RE = re.compile(r'\s*[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?\s*', re.ASCII)
+
+
+def parse_hours(value):
+    """Return value as a number of hours, or None if it is blank or not a number.
+
+    Timesheet cells are free text so 'Vaca', 'Sick' or typos like '8h' are
+    stored as entered; those count as no hours.
+    """
+    if not isinstance(value, str) or not HOURS_RE.fullmatch(value):
+        return None
+    hours = float(value)
+    return hours if math.isfinite(hours) else None
+
+
+def plausible_hours(value):
+    """Return parse_hours(value) if it is a possible day's work (0 to MAX_CELL_HOURS), else None."""
+    hours = parse_hours(value)
+    return hours if hours is not None and 0 <= hours <= MAX_CELL_HOURS else None
+
+
+def hours_error(value):
+    """Return an error message if value is a number of hours no one could work in a day."""
+    if parse_hours(value) is not None and plausible_hours(value) is None:
+        return f'hours must be between 0 and {MAX_CELL_HOURS}'
+    return None
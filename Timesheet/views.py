@@ -1,33 +1,65 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import authenticate, login, logout
-from django.contrib.auth.decorators import login_required, permission_required
+from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .forms import EmployeeForm, TimesheetForm
-from .models import Employee, Timesheet, TimesheetRow
-from .utils import is_user_locked
-from datetime import date, timedelta
+from .forms import EmployeeForm, TimesheetForm, TimesheetRowsForm, max_bulk_upload_users, max_timesheet_rows
+from .models import Employee, Timesheet, ArchivedTimesheet, DAY_FIELDS
+from .roles import is_admin, is_admin_or_accounting, is_user_group
+from .editing import save_rows, timesheet_is_editable
+from .utils import is_user_locked, unlock_user_attempts
+from .cloning import clone_latest_timesheet
+from .conflicts import find_conflicts
+from .search import search_timesheets
+from . import ledger
+from datetime import date, timedelta, MAXYEAR, MINYEAR
 from django.contrib.auth.models import User, Group
 from django.core.exceptions import PermissionDenied
-from .forms import UserCreateForm, UserGroupForm, PasswordResetForm
-from django.contrib.admin.views.decorators import staff_member_required
-from django.db import transaction
+from .forms import UserCreateForm, UserGroupForm, PasswordResetForm, TimesheetSearchForm, BulkProvisionForm, ExceptionsReportForm
+from django.core.paginator import Paginator
+from django.db.models import prefetch_related_objects
+from django.conf import settings
 from datetime import datetime
+import json
 
 
-def is_admin_or_accounting(user):
-	return user.groups.filter(name__in=['Admin', 'Accounting']).exists()
+def _rows_from_post(post):
+	"""Return (entries, errors) for the rows posted with a timesheet.
 
-
-def is_admin(user):
-	return user.groups.filter(name='Admin').exists()
-
-
-def timesheet_is_editable(ts):
-	"""Return True if current date is before the Monday after ts.week_start."""
-	# ts.week_start is a date for the Monday of the timesheet
-	next_monday = ts.week_start + timedelta(days=7)
-	today = date.today()
-	return today < next_monday
+	Rows come either from the compact rows_json payload sent by the grid script or
+	from legacy employee_{i}/hours_{i}_{d}/jobsite_name_{i}/jobsite_num_{i} keys.
+	Each entry is [employee, mon..sun, jobsite_name, jobsite_num].
+	"""
+	if 'rows_json' in post:
+		rows_form = TimesheetRowsForm(post)
+	else:
+		# legacy form-encoded path; clamp rows_count so a client can't make this loop spin
+		try:
+			rows_count = int(post.get('rows_count', '10'))
+		except ValueError:
+			rows_count = 10
+		rows_count = max(0, min(rows_count, max_timesheet_rows()))
+		entries = []
+		for i in range(0, rows_count):
+			entries.append(
+				[post.get(f'employee_{i}', '').strip()]
+				+ [post.get(f'hours_{i}_{d}', '').strip() for d in range(0, 7)]
+				+ [post.get(f'jobsite_name_{i}', '').strip(), post.get(f'jobsite_num_{i}', '').strip()]
+			)
+		# same checks (lengths, hours) as the grid payload
+		rows_form = TimesheetRowsForm({'rows_json': json.dumps(entries)})
+	if not rows_form.is_valid():
+		return None, rows_form.errors['rows_json']
+	return rows_form.cleaned_data['rows_json'], None
+
+
+def _warn_conflicts(request, ts):
+	"""Flag crew members on ts who are double-booked this week (one query)."""
+	for conflict in find_conflicts(ts.week_start, employee_ids=ts.rows.values('employee_id')):
+		others = [owner for ts_id, owner in conflict['timesheets'] if ts_id != ts.pk]
+		if others:
+			messages.warning(request, f"{conflict['employee_name']} is also on {', '.join(sorted(set(others)))}'s timesheet this week")
+		for day, total in conflict['over_limit']:
+			messages.warning(request, f"{conflict['employee_name']} has {total:g} hours on {day} across all timesheets")
 
 
 def login_view(request):
@@ -56,7 +88,7 @@ def dashboard(request):
 		timesheets = request.user.timesheets.order_by('-week_start')
 
 	# Only users in the 'User' group should see the New Timesheet / Add Crew buttons
-	is_user_group = request.user.groups.filter(name='User').exists()
+	in_user_group = is_user_group(request.user)
 
 	# handle admin delete via POST
 	if request.method == 'POST' and 'delete_timesheet' in request.POST:
@@ -77,7 +109,8 @@ def dashboard(request):
 			messages.error(request, 'Timesheet not found')
 			return redirect('Timesheet:dashboard')
 
-		ts_obj.delete()
+		with ledger.tracking([ts_obj.pk]):
+			ts_obj.delete()
 		messages.success(request, 'Timesheet deleted')
 		return redirect('Timesheet:dashboard')
 	# indicate if current user (owner) can edit
@@ -88,7 +121,7 @@ def dashboard(request):
 
 	return render(request, 'Timesheet/dashboard.html', {
 		'timesheets': timesheets,
-		'is_user_group': is_user_group,
+		'is_user_group': in_user_group,
         'is_admin': is_admin(request.user),
 		'is_admin_or_accounting': is_admin_or_accounting(request.user)
 	})
@@ -159,7 +192,7 @@ def add_employee(request):
 @login_required
 def crew_list(request):
 	# Only users in 'User' group can manage their crew
-	if not request.user.groups.filter(name='User').exists():
+	if not is_user_group(request.user):
 		raise PermissionDenied
 	# Only show active employees in the crew list
 	employees = request.user.employees.filter(is_active=True).order_by('name')
@@ -181,8 +214,8 @@ def delete_employee(request, pk):
 				emp.managers.remove(request.user)
 				messages.success(request, 'Removed from your crew')
 				return redirect('Timesheet:crew_list')
-		# Admin/Accounting can soft-delete the employee entirely (keep historical rows intact)
-		# Admin/Accounting can soft-delete the employee entirely (keep historical rows intact)
+		# Admin/Accounting can soft-delete the employee entirely (keep historical rows intact).
+		# Their rows and hours ledger are untouched, so the employee page keeps their history.
 		if is_admin_or_accounting(request.user):
 			emp.is_active = False
 			emp.save()
@@ -192,6 +225,41 @@ def delete_employee(request, pk):
 	return redirect('Timesheet:crew_list')
 
 
+@login_required
+def employee_detail(request, pk):
+	"""YTD hours, overtime and weekly trend for one crew member, read from the hours ledger."""
+	emp = get_object_or_404(Employee, pk=pk)
+	# Only a manager of the employee or admin/accounting can see their hours
+	if not emp.managers.filter(pk=request.user.pk).exists() and not is_admin_or_accounting(request.user):
+		messages.error(request, 'You do not have permission to view this employee')
+		return redirect('Timesheet:dashboard')
+
+	try:
+		year = int(request.GET.get('year', date.today().year))
+	except ValueError:
+		year = date.today().year
+	if not MINYEAR <= year <= MAXYEAR:
+		year = date.today().year
+	overtime_limit = settings.TIMESHEET_WEEKLY_OVERTIME_HOURS
+	weeks = list(emp.week_hours.filter(week_start__year=year).order_by('week_start'))
+	ytd_overtime = 0
+	max_hours = max([w.hours for w in weeks] + [overtime_limit])
+	for w in weeks:
+		w.overtime = max(w.hours - overtime_limit, 0)
+		ytd_overtime += w.overtime
+		# bar width for the weekly trend
+		w.percent = int(w.hours * 100 / max_hours)
+
+	return render(request, 'Timesheet/employee_detail.html', {
+		'employee': emp,
+		'year': year,
+		'weeks': weeks,
+		'ytd_hours': weeks[-1].ytd_hours if weeks else 0,
+		'ytd_overtime': ytd_overtime,
+		'overtime_limit': overtime_limit,
+	})
+
+
 @login_required
 def new_timesheet(request):
 	# default week_start = this week's Monday
@@ -208,78 +276,25 @@ def new_timesheet(request):
 
 	if request.method == 'POST':
 		form = TimesheetForm(request.POST)
-		if form.is_valid():
-			ts = form.save(commit=False)
-			ts.owner = request.user
-			ts.save()
-
-			# parse posted rows. pattern: employee_{i}, hours_{i}_{d}, jobsite_name_{i}, jobsite_num_{i}
-			rows_created = 0
-			try:
-				rows_count = int(request.POST.get('rows_count', '10'))
-			except ValueError:
-				rows_count = 10
-			for i in range(0, rows_count):
-				emp_field = f'employee_{i}'
-				# determine employee or free text
-				emp_val = request.POST.get(emp_field, '').strip()
-				if not emp_val:
-					# if no employee selected and no hours, skip
-					# check for any hours
-					any_hours = False
-					for d in range(0, 7):
-						if request.POST.get(f'hours_{i}_{d}', '').strip():
-							any_hours = True
-					if not any_hours:
-						continue
-
-				row = TimesheetRow(timesheet=ts)
-				# employee handling
-				if emp_val.isdigit():
-					try:
-						row.employee = Employee.objects.get(pk=int(emp_val), owner=request.user)
-						row.employee_name = row.employee.name
-					except Employee.DoesNotExist:
-						row.employee_name = ''
-				elif emp_val == 'self' or emp_val == request.user.username:
-					row.employee_name = request.user.get_full_name() or request.user.username
-				else:
-					# Only Admin/Accounting may select other users from the 'User' group.
-					# Regular users cannot pick other usernames as employees — treat as literal text.
-					if is_admin_or_accounting(request.user):
-						try:
-							user_group = Group.objects.get(name='User')
-							user = User.objects.get(username=emp_val, groups=user_group)
-							row.employee_name = user.get_full_name() or user.username
-						except (Group.DoesNotExist, User.DoesNotExist):
-							row.employee_name = emp_val
-					else:
-						row.employee_name = emp_val
-
-				# hours (store raw strings so values like 'Vaca' or 'Sick' are allowed)
-				for d, fld in enumerate(['mon', 'tues', 'wed', 'thur', 'fri', 'sat', 'sun']):
-					val = request.POST.get(f'hours_{i}_{d}', '').strip()
-					# Save the entered text; empty -> empty string to avoid NULLs
-					if val:
-						setattr(row, fld, val)
-					else:
-						setattr(row, fld, '')
-
-				row.jobsite_name = request.POST.get(f'jobsite_name_{i}', '').strip()
-				row.jobsite_num = request.POST.get(f'jobsite_num_{i}', '').strip()
-
-				# only save non-empty rows (any hours or jobsite or employee name)
-				if row.employee_name or row.jobsite_name or row.jobsite_num or any([row.mon, row.tues, row.wed, row.thur, row.fri, row.sat, row.sun]):
-					row.save()
-					rows_created += 1
+		entries, row_errors = _rows_from_post(request.POST)
+		if row_errors:
+			for error in row_errors:
+				messages.error(request, error)
+		elif form.is_valid():
+			with ledger.tracking([]) as tracked:
+				ts = form.save(commit=False)
+				ts.owner = request.user
+				ts.save()
+				tracked.append(ts.pk)
+				rows_created = save_rows(request.user, ts, entries)
 
 			messages.success(request, f'Timesheet saved ({rows_created} rows)')
+			_warn_conflicts(request, ts)
 			return redirect('Timesheet:dashboard')
 	else:
 		form = TimesheetForm(initial={'week_start': monday})
 	# provide an ISO-formatted default string for the template date input (YYYY-MM-DD)
 	week_start_default = monday.isoformat()
-	rows_range = range(0, 10)
 	day_range = range(0, 7)
 
 	# Provide active employees to template (admins see all active employees;
@@ -292,17 +307,53 @@ def new_timesheet(request):
 	return render(request, 'Timesheet/new_timesheet.html', {
 		'form': form,
 		'week_start_default': week_start_default,
-		'rows_range': rows_range,
 		'day_range': day_range,
+		'initial_rows': [],
+		'max_rows': max_timesheet_rows(),
 		'user_group_members': user_group_members,
 		'active_employees': active_employees,
 		'is_admin_or_accounting': is_admin_or_accounting(request.user)
 	})
 
 
+@login_required
+def copy_forward_timesheet(request):
+	"""Start this week's timesheet from the user's most recent one (POST only)."""
+	if request.method != 'POST':
+		return redirect('Timesheet:dashboard')
+	today = date.today()
+	monday = today - timedelta(days=today.weekday())
+
+	existing = request.user.timesheets.filter(week_start=monday).first()
+	if existing:
+		messages.info(request, 'You already have a timesheet for this week')
+		return redirect('Timesheet:edit_timesheet', pk=existing.pk)
+
+	ts = clone_latest_timesheet(request.user, monday, include_hours='include_hours' in request.POST)
+	if ts is None:
+		messages.error(request, 'No previous timesheet to copy from')
+		return redirect('Timesheet:new_timesheet')
+	messages.success(request, 'Timesheet started from your previous week')
+	return redirect('Timesheet:edit_timesheet', pk=ts.pk)
+
+
 @login_required
 def view_timesheet(request, pk):
-	ts = get_object_or_404(Timesheet, pk=pk)
+	try:
+		ts = Timesheet.objects.get(pk=pk)
+	except Timesheet.DoesNotExist:
+		# closed timesheets may have been moved to the archive; they are read-only
+		archived = get_object_or_404(ArchivedTimesheet, original_id=pk)
+		if archived.owner != request.user and not is_admin_or_accounting(request.user):
+			messages.error(request, 'You do not have permission to view this timesheet')
+			return redirect('Timesheet:dashboard')
+		return render(request, 'Timesheet/view_timesheet.html', {
+			'timesheet': archived,
+			'rows': archived.rows,
+			'archived': True,
+			'editable': False,
+			'is_admin': False,
+		})
 	# Permission: owner, Admin/Accounting can view
 	if ts.owner != request.user and not is_admin_or_accounting(request.user):
 		messages.error(request, 'You do not have permission to view this timesheet')
@@ -312,7 +363,8 @@ def view_timesheet(request, pk):
 	if request.method == 'POST' and 'delete_timesheet' in request.POST:
 		# only Admins should be allowed to delete timesheets
 		if is_admin(request.user):
-			ts.delete()
+			with ledger.tracking([ts.pk]):
+				ts.delete()
 			messages.success(request, 'Timesheet deleted')
 			return redirect('Timesheet:dashboard')
 		else:
@@ -320,7 +372,111 @@ def view_timesheet(request, pk):
 			return redirect('Timesheet:view_timesheet', pk=ts.pk)
 	# indicate if current user (owner) can edit
 	editable = (ts.owner == request.user and timesheet_is_editable(ts))
-	return render(request, 'Timesheet/view_timesheet.html', {'timesheet': ts, 'editable': editable, 'is_admin': is_admin(request.user)})
+	return render(request, 'Timesheet/view_timesheet.html', {'timesheet': ts, 'rows': ts.rows.all(), 'editable': editable, 'is_admin': is_admin(request.user)})
+
+
+@login_required
+def timesheet_search(request):
+	"""Archive search over timesheets by owner, week range, employee, jobsite and free text."""
+	# Users search their own timesheets; Admin/Accounting can search all
+	if is_admin_or_accounting(request.user):
+		timesheets = Timesheet.objects.all()
+	else:
+		timesheets = request.user.timesheets.all()
+
+	form = TimesheetSearchForm(request.GET or None)
+	page = None
+	if form.is_bound and form.is_valid():
+		criteria = dict(form.cleaned_data)
+		if not is_admin_or_accounting(request.user):
+			criteria.pop('owner')
+		results = search_timesheets(timesheets, **criteria).select_related('owner').order_by('-week_start', '-pk')
+		page = Paginator(results, 25).get_page(request.GET.get('page'))
+		# rows are loaded only for the sheets on this page
+		prefetch_related_objects(page.object_list, 'rows')
+
+	# keep the search criteria in pagination links
+	query = request.GET.copy()
+	query.pop('page', None)
+	return render(request, 'Timesheet/timesheet_search.html', {
+		'form': form,
+		'page': page,
+		'query_string': query.urlencode(),
+		'is_admin_or_accounting': is_admin_or_accounting(request.user),
+	})
+
+
+@login_required
+def archived_timesheets(request):
+	"""Closed timesheets moved out by archive_timesheets, newest week first."""
+	# Users see their own archived timesheets; Admin/Accounting can see all
+	if is_admin_or_accounting(request.user):
+		archived = ArchivedTimesheet.objects.all()
+	else:
+		archived = request.user.archived_timesheets.all()
+	archived = archived.select_related('owner').order_by('-week_start', '-original_id')
+	# rows are unpacked only for the sheets on this page
+	page = Paginator(archived, 25).get_page(request.GET.get('page'))
+	return render(request, 'Timesheet/archived_timesheets.html', {'page': page})
+
+
+@login_required
+def conflicts_report(request):
+	"""Accounting report of crew members double-booked across foremen for a week."""
+	if not is_admin_or_accounting(request.user):
+		raise PermissionDenied
+	today = date.today()
+	week_start = today - timedelta(days=today.weekday())
+	if request.GET.get('week'):
+		try:
+			week_start = datetime.strptime(request.GET['week'], '%Y-%m-%d').date()
+		except ValueError:
+			messages.error(request, 'Invalid week')
+		# any date picks the Monday of its week
+		week_start -= timedelta(days=week_start.weekday())
+
+	return render(request, 'Timesheet/conflicts_report.html', {
+		'week_start': week_start,
+		'conflicts': find_conflicts(week_start),
+		'daily_limit': settings.TIMESHEET_DAILY_HOURS_LIMIT,
+	})
+
+
+@login_required
+def exceptions_report(request):
+	"""Accounting report of payroll exceptions (long shifts, overtime, weekend work, bad entries) over a period."""
+	if not is_admin_or_accounting(request.user):
+		raise PermissionDenied
+	# pandas is only loaded once someone opens the report
+	from . import analytics
+	today = date.today()
+	# default to the last four weeks up to the current one
+	week_start = today - timedelta(days=today.weekday())
+	period = {'date_from': week_start - timedelta(weeks=3), 'date_to': week_start}
+	form = ExceptionsReportForm(request.GET or None, initial={k: v.isoformat() for k, v in period.items()})
+	page = None
+	if not form.is_bound or form.is_valid():
+		criteria = form.cleaned_data if form.is_bound else {}
+		exceptions = analytics.find_exceptions(
+			criteria.get('date_from') or period['date_from'],
+			criteria.get('date_to') or period['date_to'],
+			daily_limit=criteria.get('daily_limit'),
+			weekly_limit=criteria.get('weekly_limit'),
+			rules=[criteria['rule']] if criteria.get('rule') else None,
+		)
+		# paginate positions, then convert only this page of the frame to dicts
+		page = Paginator(range(len(exceptions)), 100).get_page(request.GET.get('page'))
+		page.object_list = analytics.as_records(exceptions.iloc[page.object_list.start:page.object_list.stop])
+
+	query = request.GET.copy()
+	query.pop('page', None)
+	return render(request, 'Timesheet/exceptions_report.html', {
+		'form': form,
+		'page': page,
+		'query_string': query.urlencode(),
+		'daily_limit': settings.TIMESHEET_DAILY_HOURS_LIMIT,
+		'weekly_limit': settings.TIMESHEET_WEEKLY_OVERTIME_HOURS,
+	})
 
 
 @login_required
@@ -370,6 +526,29 @@ def create_user(request):
 	return render(request, 'Timesheet/create_user.html', {'form': form})
 
 
+@login_required
+def bulk_provision(request):
+	"""Admin upload of users, crew members and manager assignments from one CSV file."""
+	if not is_admin(request.user):
+		raise PermissionDenied
+	# the CSV parser is only loaded when an admin uploads
+	from . import provisioning
+
+	if request.method == 'POST':
+		form = BulkProvisionForm(request.POST, request.FILES)
+		if form.is_valid():
+			users, employees, assignments = provisioning.apply(form.cleaned_data['csv_file'], parallel=False)
+			messages.success(request, f'Created {users} users and {employees} crew members; {assignments} manager assignments processed')
+			return redirect('Timesheet:user_management')
+	else:
+		form = BulkProvisionForm()
+	return render(request, 'Timesheet/bulk_provision.html', {
+		'form': form,
+		'columns': provisioning.COLUMNS,
+		'max_users': max_bulk_upload_users(),
+	})
+
+
 @login_required
 def reactivate_user(request, pk):
 	if not is_admin_or_accounting(request.user):
@@ -431,9 +610,8 @@ def unlock_user(request, pk):
         raise PermissionDenied
     user = get_object_or_404(User, pk=pk)
     if request.method == 'POST':
-        # Delete all access attempt records for this user
-        from axes.models import AccessAttempt
-        AccessAttempt.objects.filter(username=user.username).delete()
+        # Clear all failed access attempts for this user (database or cache handler)
+        unlock_user_attempts(user.username)
         messages.success(request, 'Account unlocked')
     return redirect('Timesheet:user_management')
 
@@ -449,81 +627,28 @@ def edit_timesheet(request, pk):
 		return redirect('Timesheet:view_timesheet', pk=ts.pk)
 
 	if request.method == 'POST':
-		# Remove existing rows and recreate from post inside a transaction
-		rows_created = 0
-		try:
-			rows_count = int(request.POST.get('rows_count', '10'))
-		except ValueError:
-			rows_count = 10
+		entries, row_errors = _rows_from_post(request.POST)
+		if row_errors:
+			for error in row_errors:
+				messages.error(request, error)
+			return redirect('Timesheet:edit_timesheet', pk=ts.pk)
 
-		with transaction.atomic():
+		# Remove existing rows and recreate from post inside a transaction
+		with ledger.tracking([ts.pk]):
 			ts.rows.all().delete()
-			for i in range(0, rows_count):
-				emp_val = request.POST.get(f'employee_{i}', '').strip()
-				if not emp_val:
-					any_hours = False
-					for d in range(0, 7):
-						if request.POST.get(f'hours_{i}_{d}', '').strip():
-							any_hours = True
-					if not any_hours:
-						continue
-
-				row = TimesheetRow(timesheet=ts)
-				if emp_val.isdigit():
-					try:
-						# Admin/Accounting can select any employee; others only their own
-						if is_admin_or_accounting(request.user):
-							row.employee = Employee.objects.get(pk=int(emp_val))
-						else:
-							row.employee = Employee.objects.get(pk=int(emp_val), owner=request.user)
-						row.employee_name = row.employee.name
-					except Employee.DoesNotExist:
-						row.employee_name = ''
-				elif emp_val == 'self' or emp_val == ts.owner.username:
-					row.employee_name = ts.owner.get_full_name() or ts.owner.username
-				else:
-					# Only Admin/Accounting may select other users from the 'User' group.
-					# Regular users cannot pick other usernames as employees — treat as literal text.
-					if is_admin_or_accounting(request.user):
-						try:
-							user_group = Group.objects.get(name='User')
-							user = User.objects.get(username=emp_val, groups=user_group)
-							row.employee_name = user.get_full_name() or user.username
-						except (Group.DoesNotExist, User.DoesNotExist):
-							row.employee_name = emp_val
-					else:
-						row.employee_name = emp_val
-
-				for d, fld in enumerate(['mon', 'tues', 'wed', 'thur', 'fri', 'sat', 'sun']):
-					val = request.POST.get(f'hours_{i}_{d}', '').strip()
-					# Preserve raw input (text or numbers). Empty -> empty string to avoid NULLs
-					if val:
-						setattr(row, fld, val)
-					else:
-						setattr(row, fld, '')
-
-				row.jobsite_name = request.POST.get(f'jobsite_name_{i}', '').strip()
-				row.jobsite_num = request.POST.get(f'jobsite_num_{i}', '').strip()
-
-				if row.employee_name or row.jobsite_name or row.jobsite_num or any([row.mon, row.tues, row.wed, row.thur, row.fri, row.sat, row.sun]):
-					row.save()
-					rows_created += 1
+			rows_created = save_rows(request.user, ts, entries)
 
 		messages.success(request, f'Timesheet updated ({rows_created} rows)')
+		_warn_conflicts(request, ts)
 		# save additional notes
 		ts.additional_notes = request.POST.get('additional_notes', '').strip()
 		ts.save()
 		return redirect('Timesheet:view_timesheet', pk=ts.pk)
 
-	# prepare form-like context
-	rows = list(ts.rows.all())
-	length = max(10, len(rows))
-	rows_range = range(0, length)
-	# build rows_by_index padded with None for missing entries so template access is simple
-	rows_by_index = [rows[i] if i < len(rows) else None for i in range(0, length)]
 	day_range = range(0, 7)
-	user_display = request.user.get_full_name() or request.user.username
-    
+	# 'self' rows resolve to the timesheet owner on save, so label and match them that way
+	user_display = ts.owner.get_full_name() or ts.owner.username
+
 	# Admin/Accounting can see all employees; others see their own
 	if is_admin_or_accounting(request.user):
 		employees = Employee.objects.all().order_by('name')
@@ -537,12 +662,24 @@ def edit_timesheet(request, pk):
 	else:
 		user_group_members = []
 
+	# existing rows in the compact [employee, mon..sun, jobsite_name, jobsite_num] shape the grid script renders
+	member_values = {(u.get_full_name() or u.username): u.username for u in user_group_members}
+	initial_rows = []
+	for row in ts.rows.all():
+		if row.employee_id:
+			emp_val = str(row.employee_id)
+		elif row.employee_name == user_display:
+			emp_val = 'self'
+		else:
+			emp_val = member_values.get(row.employee_name, '')
+		initial_rows.append([emp_val] + [getattr(row, fld) for fld in DAY_FIELDS] + [row.jobsite_name, row.jobsite_num])
+
 	return render(request, 'Timesheet/edit_timesheet.html', {
 		'user_group_members': user_group_members,
 		'timesheet': ts,
 		'additional_notes': ts.additional_notes,
-		'rows_by_index': rows_by_index,
-		'rows_range': rows_range,
+		'initial_rows': initial_rows,
+		'max_rows': max_timesheet_rows(),
 		'day_range': day_range,
 		'user_display': user_display,
 		'employees': employees,